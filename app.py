@@ -1,25 +1,34 @@
 import dash
 from dash import html, dcc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ALL, Input, Output, State
+from components.i18n import i18n
 from components.sidebar import sidebar_layout
 
 from translation import translations
 from layouts.economy.salary import register_salary_callbacks, salary_layout
-from layouts.economy.salary_short import salary_short_layout
-#from layouts.economy.salary_short import register_salary_short_callbacks, salary_short_layout
+from layouts.economy.salary_short import register_salary_short_callbacks, salary_short_layout, zoom_cache
 from layouts.environment.envirStatus import envirstatus_layout
 from layouts.population.ive import ive_layout
-from utils.helpers import ask_gpt, get_openai_client, set_openai_client
+from utils.helpers import ask_gpt, cached_gpt_answer, gpt_cache, gpt_jobs, meta_cache_stats
+from utils.jobs import QueueFull
+from utils.compression import init_compression, payload_stats
+from utils.cube import cube_cache
+from utils.figures import figure_cache
+from utils.views import view_cache
+from utils import metrics, profiling, warmup
+from utils.refresher import refresher
+from utils.stat_client import coalescing_stats, connection_stats, revalidation_stats
+from flask import Response, jsonify
 from pathlib import Path
 from dotenv import load_dotenv
+import logging
 import os
-import time
 
 
 env_path = Path(__file__).resolve().parent / ".env"
 load_dotenv(env_path)
-client = get_openai_client()
-set_openai_client(client)
+
+_log = logging.getLogger(__name__)
 
 
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
@@ -27,6 +36,54 @@ app.title = "Stats Dashboard"
 
 # Renderi jaoks vajalik Flask serveri objekt
 server = app.server
+init_compression(server)
+
+
+# Valmisoleku kontroll: 200 alles siis, kui vahemälud on soojendatud (vt gunicorn.conf.py)
+@server.route("/ready")
+def ready():
+    return jsonify(warmup.status()), 200 if warmup.is_ready() else 503
+
+
+# Taustal värskendatavate andmekogumite vanus ja vead
+@server.route("/status/datasets")
+def datasets_status():
+    return jsonify(refresher.status())
+
+
+# GPT vastuste vahemälu tabamuste määr ja taustatööde järjekord
+@server.route("/status/gpt")
+def gpt_status():
+    return jsonify({"cache": gpt_cache.stats(), "jobs": gpt_jobs.stats()})
+
+
+# Callback'ide vastuste suurus baitides (enne ja pärast tihendamist)
+@server.route("/status/payloads")
+def payloads_status():
+    return jsonify(payload_stats())
+
+
+# Vahemälude tabamused loetakse /metrics päringu ajal olemasolevatest loenduritest
+metrics.register_cache("meta", meta_cache_stats)
+metrics.register_cache("cube", cube_cache.stats)
+metrics.register_cache("figure", figure_cache.stats)
+metrics.register_cache("zoom", zoom_cache.stats)
+metrics.register_cache("view", view_cache.stats)
+metrics.register_cache("gpt", gpt_cache.stats)
+metrics.register_cache("singleflight", lambda: {
+    "hits": coalescing_stats()["coalesced"], "misses": coalescing_stats()["executed"]})
+metrics.register_cache("revalidation", lambda: {
+    "hits": revalidation_stats()["not_modified"],
+    "misses": connection_stats()["requests"] - revalidation_stats()["not_modified"],
+    "size": revalidation_stats()["validators"]})
+metrics.register_cache("connections", lambda: {
+    "hits": connection_stats()["reused"], "misses": connection_stats()["connections"]})
+
+
+# Prometheus tekstivormingus mõõdikud (callback'ide ja stat.ee päringute kestus, vahemälud)
+@server.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 
 app.layout = html.Div([
@@ -40,10 +97,13 @@ app.layout = html.Div([
 
     # Globaalne keel, salvestatakse brauseri localStorage'i
     dcc.Store(id="language-store", data="et", storage_type="local"),  # ← globaalne keel
+
+    # Tõlketabel saadetakse brauserisse üks kord, keelevahetus toimub clientside callback'ides
+    dcc.Store(id="translations-store", data=translations),
     
      # Keelevalik dropdown
     html.Div([
-        html.Div(id="language-label",
+        i18n(html.Div, "language.label", "et",
                   style={
                     "marginRight": "10px",
                     "alignSelf": "center"
@@ -68,6 +128,7 @@ app.layout = html.Div([
             html.Button("Küsi GPT-lt",
                          id="ask_button",
                          style={"backgroundColor":"#4CAF50","color":"white"}),
+            html.Button("Tühista", id="gpt_cancel"),
             dcc.Textarea(id="user_input", style={"border":"None","width": "400px", "height": "100px"})
             ], 
             style={
@@ -83,7 +144,9 @@ app.layout = html.Div([
         dcc.Loading(
             type="circle",
             children=html.Div(id="gpt_response"), style={"alignItems": "center"}),
-        dcc.Store(id="loading_state", data=False)  # False = not loading
+        dcc.Store(id="loading_state", data=False),  # False = not loading
+        dcc.Store(id="gpt_job"),                     # taustatöö id
+        dcc.Interval(id="gpt_poll", interval=500, disabled=True)
     ], 
         style={            
             "display": "flex",
@@ -92,6 +155,9 @@ app.layout = html.Div([
             "padding": "10px"
     }),
 
+    # Külgmenüü on lehest sõltumatu, selle tekstid tõlgitakse brauseris
+    sidebar_layout("et"),
+
     # Siia renderdatakse lehe sisu  
     html.Div(
         id="page-content", style={"marginLeft": "14%", "padding": "20px", "border": "1px solid lightgrey"})
@@ -112,20 +178,73 @@ app.clientside_callback(
     prevent_initial_call=True
 )
 
-# 2 Server callback – teeb töö, tagastab ainult gpt_response.children
+# 2 Server callback – paneb GPT päringu taustajärjekorda ja käivitab oleku küsimise
 @app.callback(
+    Output("gpt_job", "data"),
+    Output("gpt_poll", "disabled"),
     Output("gpt_response", "children"),
+    Output("loading_state", "data", allow_duplicate=True),
     Input("ask_button", "n_clicks"),
     State("user_input", "value"),
+    State("language-store", "data"),
+    prevent_initial_call=True
+)
+def fetch_response(n_clicks, user_text, lang):
+    if not user_text:
+        return None, True, "", False
+
+    # Korduv küsimus: vastus kohe vahemälust, ilma taustatööta
+    cached = cached_gpt_answer(user_text, lang or "et")
+    if cached is not None:
+        return None, True, cached, False
+
+    try:
+        # Vahemälu on juba kontrollitud, taustatöö läheb otse API-sse
+        job_id = gpt_jobs.submit(ask_gpt, user_text, lang or "et", use_cache=False)
+    except QueueFull:
+        return None, True, "Liiga palju päringuid korraga, proovi hetke pärast uuesti.", False
+    return job_id, False, "", True
+
+# 2b Taustatöö oleku küsimine – tagastab vastuse, kui töö on valmis
+@app.callback(
+    Output("gpt_response", "children", allow_duplicate=True),
+    Output("gpt_poll", "disabled", allow_duplicate=True),
+    Output("loading_state", "data", allow_duplicate=True),
+    Input("gpt_poll", "n_intervals"),
+    State("gpt_job", "data"),
     prevent_initial_call=True
 )
-def fetch_response(n_clicks, user_text):
-    time.sleep(2)  # simuleeri aeglast päringut
+def poll_response(n_intervals, job_id):
+    status = gpt_jobs.status(job_id) if job_id else {"state": "unknown"}
+    state = status["state"]
+    if state in ("queued", "running"):
+        return dash.no_update, False, True
+
+    if state == "done":
+        result = status["result"]
+        _log.debug("GPT job %s done (%d chars)", job_id, len(result))
+    elif state == "timeout":
+        result = "GPT ei vastanud õigeaegselt. Proovi hiljem uuesti."
+    elif state == "cancelled":
+        result = "Päring tühistati."
+    else:
+        _log.warning("GPT job %s ended with %s", job_id, status)
+        result = "Vabandust, praegu ei õnnestu GPT-lt vastust saada. Proovi hiljem uuesti."
+    return result, True, False
 
-    result = ask_gpt(user_text)
-    print("GPT vastus:", result)
-    # NB: ei puuduta loading_state siin, ainult response
-    return result
+# 2c Tühistamine
+@app.callback(
+    Output("gpt_response", "children", allow_duplicate=True),
+    Output("gpt_poll", "disabled", allow_duplicate=True),
+    Output("loading_state", "data", allow_duplicate=True),
+    Input("gpt_cancel", "n_clicks"),
+    State("gpt_job", "data"),
+    prevent_initial_call=True
+)
+def cancel_response(n_clicks, job_id):
+    if job_id:
+        gpt_jobs.cancel(job_id)
+    return "Päring tühistati.", True, False
 
 # 3 Mapping callback – seab disabled oleku loading_state põhjal
 @app.callback(
@@ -140,10 +259,12 @@ def set_disabled(is_loading):
 
 #--------------------------------------------------------------------------------------
 
+# Keel on State: keelevahetus ei ehita lehte uuesti, tekstid vahetab i18n clientside callback
+# ja keelespetsiifilised andmed (joonised, valikud) uuendavad lehe enda callback'id
 @app.callback(
         Output("page-content", "children"),
-        [Input("url", "pathname"),
-         Input("language-store", "data")]   # ← lisa ka see Input
+        Input("url", "pathname"),
+        State("language-store", "data")
 )
 def display_page(pathname, lang):
     if not lang:
@@ -158,34 +279,47 @@ def display_page(pathname, lang):
     else:
         content = salary_layout(lang)  # default
     
-    return html.Div([
-        sidebar_layout(lang),
-        html.Div(content, style={"marginLeft": "5%", "padding": "20px"})
-    ])
+    return html.Div(content, style={"marginLeft": "5%", "padding": "20px"})
 
 register_salary_callbacks(app)
-#register_salary_short_callbacks(app)
+register_salary_short_callbacks(app)
 
 
-#Dropdown → Store
-@app.callback(
+#Dropdown → Store (brauseris)
+app.clientside_callback(
+    """
+    function(selected_lang) {
+        return selected_lang;
+    }
+    """,
     Output("language-store", "data"),
     Input("language-dropdown", "value")
 )
-def update_language_store(selected_lang):
-    return selected_lang
 
-@app.callback(
-    Output("language-label", "children"),
-    Input("language-store", "data")
+# Kõik i18n() elemendid (külgmenüü, pealkirjad, sildid) tõlgitakse brauseris
+app.clientside_callback(
+    """
+    function(lang, ids, table) {
+        var texts = table[lang || "et"] || table["et"];
+        return ids.map(function(id) { return texts[id.key]; });
+    }
+    """,
+    Output({"type": "i18n", "key": ALL}, "children"),
+    Input("language-store", "data"),
+    State({"type": "i18n", "key": ALL}, "id"),
+    State("translations-store", "data")
 )
-def update_label(lang):
-    if not lang:
-        lang = "et"
-    return translations[lang]["language.label"]
+
+# Kõigi serveripoolsete callback'ide kestus ja vead /metrics jaoks (pärast kõigi registreerimist)
+metrics.instrument_callbacks(app)
+
+# Valikuline profileerimine (DASH_PROFILE / DASH_PROFILE_TOKEN), väljas olles mähiseid ei lisata
+profiling.instrument_callbacks(app)
 
 
 if __name__ == "__main__":
-    import os
+    # Arendusserver; tootmises: gunicorn -c gunicorn.conf.py
     port = int(os.environ.get("PORT", 8050))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    debug = os.environ.get("DASH_DEBUG", "").lower() in ("1", "true", "yes")
+    warmup.warmup_in_background()
+    app.run(host="0.0.0.0", port=port, debug=debug)
@@ -0,0 +1,244 @@
+"""
+Andme- ja joonisetoru offline-jõudlustest sünteetiliste (või salvestatud) stat.ee vastustega.
+
+Mõõdetavad etapid:
+    parse_json / parse_jsonstat2   PA103 vastuse dekodeerimine (utils.tables.decode_response)
+    parse_pa117_jsonstat2          PA117 vastuse dekodeerimine
+    comparison_table               salary_layout'i groupby/pivot/sort/label-wrap (sector_comparison_table)
+    figure_all / figure_single     update_salary_graph'i joonise ehitus (build_salary_figure)
+    serialize_<engine>             joonise JSON serialiseerimine, baidid ja gzip baidid
+    downsample_<method>            pika aegrea vähendamine ekraani laiuseni (utils.downsample)
+
+Käivitamine (repo juurkaustast):
+    python -m benchmarks.bench_pipeline --sectors 100 --years 25 --indicators 3 --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+    python -m benchmarks.bench_pipeline --recorded recorded_pa103.json
+
+Salvestatud fail on kujul {"meta": <GET vastus>, "json": <POST json>, "json-stat2": <POST json-stat2>}.
+"""
+import argparse
+import gzip
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import plotly.io as pio
+
+from layouts.economy.salary import build_salary_figure, sector_comparison_table
+from utils.downsample import downsample
+from utils.helpers import meta_options
+from utils.tables import add_labels, decode_response
+
+
+BASE_INDICATORS = ["GR_W_AVG", "GR_W_D5", "GR_W_AVG_SM"]
+
+
+def synthetic_meta(dims):
+    """dims: [(kood, [väärtused], [tekstid]), ...] -> metaandmete GET vastus."""
+    return {
+        "title": "Synthetic",
+        "updated": "2025-01-01T00:00:00Z",
+        "variables": [
+            {"code": code, "text": code, "values": values, "valueTexts": texts}
+            for code, values, texts in dims
+        ],
+    }
+
+
+def synthetic_responses(dims, seed=0):
+    """Tagastab samade väärtustega "json" ja "json-stat2" vastused."""
+    rng = np.random.default_rng(seed)
+    sizes = [len(values) for _, values, _ in dims]
+    values = np.round(rng.uniform(500, 4000, int(np.prod(sizes))), 1)
+    # ~2% puuduvaid väärtusi nagu päris tabelites
+    missing = rng.random(values.size) < 0.02
+
+    grid = np.indices(sizes).reshape(len(sizes), -1).T
+    rows = [
+        {"key": [dims[d][1][i] for d, i in enumerate(idx)], "values": [".." if miss else str(val)]}
+        for idx, val, miss in zip(grid, values, missing)
+    ]
+    as_json = {"columns": [{"code": code} for code, _, _ in dims], "data": rows}
+
+    as_jsonstat2 = {
+        "version": "2.0",
+        "class": "dataset",
+        "id": [code for code, _, _ in dims],
+        "size": sizes,
+        "dimension": {
+            code: {"label": code, "category": {
+                "index": {v: i for i, v in enumerate(vals)},
+                "label": dict(zip(vals, texts)),
+            }}
+            for code, vals, texts in dims
+        },
+        "value": [None if miss else float(val) for val, miss in zip(values, missing)],
+    }
+    return as_json, as_jsonstat2
+
+
+def pa103_dims(sectors, years, indicators):
+    extra = [f"IND_{i}" for i in range(max(indicators - len(BASE_INDICATORS), 0))]
+    ind_codes = (BASE_INDICATORS + extra)[:indicators]
+    sector_codes = ["TOTAL"] + [f"S{i:03d}" for i in range(sectors)]
+    # pikad nimetused, et sildi murdmine (textwrap) oleks realistlik
+    sector_texts = ["Kõik tegevusalad"] + [
+        f"Tegevusala {i} – töötlev tööstus, hulgi- ja jaekaubandus ning mootorsõidukite remont" for i in range(sectors)
+    ]
+    year_codes = [str(2000 + i) for i in range(years)]
+    return [
+        ("Näitaja", ind_codes, [f"Näitaja {c}" for c in ind_codes]),
+        ("Tegevusala", sector_codes, sector_texts),
+        ("Vaatlusperiood", year_codes, year_codes),
+    ]
+
+
+def pa117_dims(counties, periods, indicators):
+    ind_codes = (BASE_INDICATORS + [f"IND_{i}" for i in range(indicators)])[:indicators]
+    county_codes = ["EE"] + [f"M{i:02d}" for i in range(counties)]
+    period_codes = [f"{2000 + i // 4}Q{i % 4 + 1}" for i in range(periods)]
+    return [
+        ("Näitaja", ind_codes, ind_codes),
+        ("Maakond", county_codes, county_codes),
+        ("Vaatlusperiood", period_codes, period_codes),
+    ]
+
+
+def measure(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+    }, result
+
+
+def run(args):
+    if args.recorded:
+        with open(args.recorded, encoding="utf-8") as f:
+            recorded = json.load(f)
+        meta = recorded["meta"]
+        as_json, as_jsonstat2 = recorded["json"], recorded["json-stat2"]
+    else:
+        dims = pa103_dims(args.sectors, args.years, args.indicators)
+        meta = synthetic_meta(dims)
+        as_json, as_jsonstat2 = synthetic_responses(dims, args.seed)
+
+    opts = meta_options(meta)
+    cells = len(as_jsonstat2["value"])
+    stages = {}
+
+    timing, _ = measure(lambda: decode_response("PA103", as_json, "json", meta), args.repeat)
+    stages["parse_json"] = {**timing, "cells": cells, "cells_per_s": round(cells / (timing["median_ms"] / 1000))}
+
+    timing, df = measure(lambda: decode_response("PA103", as_jsonstat2, "json-stat2", meta), args.repeat)
+    stages["parse_jsonstat2"] = {**timing, "cells": cells, "cells_per_s": round(cells / (timing["median_ms"] / 1000))}
+
+    short_dims = pa117_dims(args.counties, args.periods, args.indicators)
+    _, short_jsonstat2 = synthetic_responses(short_dims, args.seed)
+    short_meta = synthetic_meta(short_dims)
+    short_cells = len(short_jsonstat2["value"])
+    timing, _ = measure(lambda: decode_response("PA117", short_jsonstat2, "json-stat2", short_meta), args.repeat)
+    stages["parse_pa117_jsonstat2"] = {**timing, "cells": short_cells}
+
+    df = add_labels(df, "PA103", meta)
+    latest_year = df["aasta"].max()
+    df_latest = df[(df["aasta"] == latest_year) & (df["tegevusala"] != "TOTAL")
+                   & df["näitaja"].isin(["GR_W_AVG", "GR_W_D5"])]
+    timing, table = measure(lambda: sector_comparison_table(df_latest, opts), args.repeat)
+    stages["comparison_table"] = {**timing, "rows_in": len(df_latest), "rows_out": len(table)}
+
+    df_total = df[df["tegevusala"] == "TOTAL"]
+    timing, fig_all = measure(lambda: build_salary_figure(df_total, "ALL", "et"), args.repeat)
+    stages["figure_all"] = {**timing, "points": len(df_total)}
+
+    df_single = df_total[df_total["näitaja"] == "GR_W_AVG"]
+    timing, _ = measure(lambda: build_salary_figure(df_single, "GR_W_AVG", "et"), args.repeat)
+    stages["figure_single"] = {**timing, "points": len(df_single)}
+
+    engines = ["json"]
+    try:
+        import orjson  # noqa: F401
+        engines.append("orjson")
+    except ImportError:
+        pass
+    for engine in engines:
+        timing, payload = measure(lambda: pio.to_json(fig_all, engine=engine), args.repeat)
+        raw = payload.encode("utf-8")
+        stages[f"serialize_{engine}"] = {**timing, "bytes": len(raw), "gzip_bytes": len(gzip.compress(raw))}
+
+    rng = np.random.default_rng(args.seed)
+    x = np.arange(args.series_points, dtype=float)
+    y = np.cumsum(rng.normal(0, 1, args.series_points))
+    for method in ("lttb", "minmax"):
+        timing, picked = measure(lambda: downsample(x, y, 1000, method), args.repeat)
+        stages[f"downsample_{method}"] = {**timing, "points_in": args.series_points, "points_out": len(picked)}
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "stages": stages,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline):
+    """Prindib etappide mediaanaja muutuse võrreldes varasema tulemusega."""
+    print(f"{'etapp':<24}{'enne ms':>12}{'nüüd ms':>12}{'suhe':>8}")
+    for stage, result in current["stages"].items():
+        before = baseline["stages"].get(stage)
+        if before is None:
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("nan")
+        print(f"{stage:<24}{before['median_ms']:>12.3f}{result['median_ms']:>12.3f}{ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Andme- ja joonisetoru jõudlustest")
+    parser.add_argument("--sectors", type=int, default=90)
+    parser.add_argument("--years", type=int, default=25)
+    parser.add_argument("--indicators", type=int, default=3)
+    parser.add_argument("--counties", type=int, default=15)
+    parser.add_argument("--periods", type=int, default=100)
+    parser.add_argument("--series-points", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recorded", help="salvestatud PA103 vastused (JSON)")
+    parser.add_argument("--output", help="kirjuta tulemus JSON-faili")
+    parser.add_argument("--compare", help="võrdle varasema tulemusfailiga")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
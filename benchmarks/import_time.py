@@ -0,0 +1,99 @@
+"""
+`import app` ajakulu aruanne (python -X importtime), et workeri käivitusaja regressioonid oleksid näha.
+
+Käivitamine (repo juurkaustast):
+    python -m benchmarks.import_time                      # 15 kõige kallimat paketti
+    python -m benchmarks.import_time --budget-ms 1500     # nullist erinev väljumiskood, kui eelarve ületatud
+    python -m benchmarks.import_time --output imports.json
+    python -m benchmarks.import_time --compare imports.json
+
+Mõõtmine tehakse eraldi protsessis, mitu korda; aruandes on iga paketi mediaanne kumulatiivne aeg.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def sample(module):
+    """Üks mõõtmine: {tipptaseme pakett: kumulatiivne aeg ms}, kogu importimise aeg ms."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr.strip().splitlines()[-1])
+
+    packages = defaultdict(float)
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        # Tipptaseme moodulite rida (taandeta) sisaldab kõigi tema alamimportide aega
+        if name == name.lstrip():
+            packages[name.split(".")[0]] += int(cumulative) / 1000
+            total += int(cumulative) / 1000
+    return packages, total
+
+
+def run(module, repeat):
+    runs = [sample(module) for _ in range(repeat)]
+    names = set().union(*(packages for packages, _ in runs))
+    packages = {name: round(statistics.median(p.get(name, 0.0) for p, _ in runs), 1) for name in names}
+    return {
+        "module": module,
+        "runs": repeat,
+        "total_ms": round(statistics.median(total for _, total in runs), 1),
+        "packages": dict(sorted(packages.items(), key=lambda item: -item[1])),
+    }
+
+
+def report(result, top):
+    print(f"import {result['module']}: {result['total_ms']:.1f} ms (mediaan {result['runs']} korrast)")
+    for name, ms in list(result["packages"].items())[:top]:
+        print(f"  {name:<28}{ms:>10.1f} ms")
+
+
+def compare(current, baseline, top):
+    print(f"{'pakett':<28}{'enne ms':>10}{'nüüd ms':>10}")
+    print(f"{'KOKKU':<28}{baseline['total_ms']:>10.1f}{current['total_ms']:>10.1f}")
+    for name, ms in list(current["packages"].items())[:top]:
+        print(f"{name:<28}{baseline['packages'].get(name, 0.0):>10.1f}{ms:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importimise ajakulu aruanne")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "0")),
+                        help="lubatud kogu importimise aeg; 0 = ei kontrollita")
+    parser.add_argument("--output", help="kirjuta tulemus JSON-faili")
+    parser.add_argument("--compare", help="võrdle varasema tulemusfailiga")
+    args = parser.parse_args(argv)
+
+    result = run(args.module, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f), args.top)
+    else:
+        report(result, args.top)
+
+    if args.budget_ms and result["total_ms"] > args.budget_ms:
+        print(f"Eelarve ületatud: {result['total_ms']:.1f} ms > {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
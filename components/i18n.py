@@ -0,0 +1,15 @@
+from translation import translations
+
+
+def i18n_id(key):
+    """Tõlgitava elemendi id; keelevahetusel uuendab teksti brauseris clientside callback."""
+    return {"type": "i18n", "key": key}
+
+
+def i18n(component, key, lang="et", **kwargs):
+    """
+    Loob komponendi, mille tekst on tõlkevõti `key`. Esialgne tekst on keeles `lang`,
+    edasised keelevahetused tehakse brauseris ilma serveri päringuta.
+    NB: sama võti võib lehel korraga olla ainult ühe elemendi küljes.
+    """
+    return component(translations[lang][key], id=i18n_id(key), **kwargs)
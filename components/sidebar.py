@@ -1,27 +1,27 @@
 from dash import html, dcc
-from translation import translations
+from components.i18n import i18n
 
 
 def sidebar_layout(lang="et"):
     return html.Div([
-    html.H2(translations[lang]["sidebar.title"], style={"padding": "10px"}),
+    i18n(html.H2, "sidebar.title", lang, style={"padding": "10px"}),
     html.Hr(),
             # Põhimenüü: Salary
         html.Div([
-            dcc.Link(translations[lang]["sidebar.salary"], href="/economy",
-                     style={"display": "block", "padding": "10px", "font-weight": "bold"}),
+            i18n(dcc.Link, "sidebar.salary", lang, href="/economy",
+                 style={"display": "block", "padding": "10px", "font-weight": "bold"}),
 
             # Alammenüü lingid
             html.Div([
-                dcc.Link(translations[lang]["sidebar.salary.longterm"], href="/economy/longterm",
-                         style={"display": "block", "padding": "5px 20px"}),
-                dcc.Link(translations[lang]["sidebar.salary.shortterm"], href="/economy/shortterm",
-                         style={"display": "block", "padding": "5px 20px"}),
+                i18n(dcc.Link, "sidebar.salary.longterm", lang, href="/economy/longterm",
+                     style={"display": "block", "padding": "5px 20px"}),
+                i18n(dcc.Link, "sidebar.salary.shortterm", lang, href="/economy/shortterm",
+                     style={"display": "block", "padding": "5px 20px"}),
             ])
         ]),
     #dcc.Link(translations[lang]["sidebar.salary"], href="/economy", style={"display": "block", "padding": "10px"}),
-    dcc.Link(translations[lang]["sidebar.env"], href="/enviroment", style={"display": "block", "padding": "10px"}),
-    dcc.Link(translations[lang]["sidebar.pop"], href="/population", style={"display": "block", "padding": "10px"}),
+    i18n(dcc.Link, "sidebar.env", lang, href="/enviroment", style={"display": "block", "padding": "10px"}),
+    i18n(dcc.Link, "sidebar.pop", lang, href="/population", style={"display": "block", "padding": "10px"}),
 ], style={
     "position": "fixed",
     "top": 0,
@@ -33,4 +33,3 @@ def sidebar_layout(lang="et"):
     "overflow": "auto"
 })
 
-
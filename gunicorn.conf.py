@@ -0,0 +1,51 @@
+"""
+Tootmise käivitusprofiil:  gunicorn -c gunicorn.conf.py
+
+Rakendus laetakse ja vahemälud soojendatakse enne workerite fork'i (preload_app + when_ready),
+seega iga worker (ka max_requests järel uuesti loodud) alustab soojade vahemäludega.
+Callback'id ootavad peamiselt stat.ee ja OpenAI vastuseid, seega kasutame lõimedega workereid.
+GPT taustatööde olek on jagatud SQLite failis (GPT_JOBS_PATH), seega töötab see ka mitme workeriga.
+"""
+import multiprocessing
+import os
+
+
+wsgi_app = "app:server"
+bind = f"0.0.0.0:{os.getenv('PORT', '8050')}"
+
+preload_app = True
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 4))))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Workerid taaskäivitatakse aeg-ajalt (mälu), uus worker fork'itakse soojast masterist
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # Käivitub masteris pärast rakenduse laadimist ja enne esimeste workerite loomist. Master ei
+    # tohi käivitada lõimi (refresher, fetch/chunk kogumid, asünkroonne tsükkel): need jääksid
+    # masterisse API-t küsitlema ja fork'i hetkel hoitud lukud jääksid workerites kinni.
+    # Seega tehakse kõik päringud järjest.
+    from utils.warmup import warmup
+    from utils.workers import inline
+
+    with inline():
+        result = warmup()
+    server.log.info("Warmup finished in %ss (%d errors)", result["duration_s"], len(result["errors"]))
+
+
+def post_worker_init(worker):
+    # Ilma preload_app'ita soojendab iga worker ise (warmup() ei tee midagi, kui juba tehtud)
+    if not worker.cfg.preload_app:
+        from utils.warmup import warmup
+
+        warmup()
@@ -1,151 +1,65 @@
-
-import plotly.express as px
 import pandas as pd
-import requests
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from services.fetch_data import get_salary_data
-from utils.helpers import apply_common_legend, get_meta_options
+from utils.helpers import apply_common_legend, get_table_version
+from utils.figures import cached_data_figure, cached_figure, figure_key
+from utils.views import materialized
+from utils.async_client import gather_sync, run_sync
+from utils.tables import fetch_table, fetch_table_async, role_options, role_options_async
+from utils.refresher import refresher
 from translation import translations   # ← import siit
+from components.i18n import i18n
 from dash import Input, Output, html, dcc
 import traceback
 import textwrap
 
-def get_pa103_data(indicator=None, emtak="TOTAL", years=None, lang="et"):
-    # Fetch table metadata first so we can use the language-specific variable codes
-    meta_url = f"https://andmed.stat.ee/api/v1/{lang}/stat/PA103"
-    meta = requests.get(meta_url).json()
-
-    variables = [v["code"] for v in meta.get("variables", [])]
-
-    # Build query using the variable codes from metadata (language-specific)
-    query = []
-
-    # Näitaja filter (first variable expected to be the indicator)
-    if indicator:
-        if isinstance(indicator, str):
-            indicator = [indicator]
-        code = variables[0] if len(variables) > 0 else "Näitaja"
-        query.append({
-            "code": code,
-            "selection": {"filter": "item", "values": indicator}
-        })
-
-    # Tegevusala filter (second variable)
-    if emtak:
-        if isinstance(emtak, str):
-            emtak = [emtak]
-        code = variables[1] if len(variables) > 1 else "Tegevusala"
-        query.append({
-            "code": code,
-            "selection": {"filter": "item", "values": emtak}
-        })
-
-    # Aastad (third variable)
-    if years:
-        if isinstance(years, (int, str)):
-            years = [str(years)]
-        else:
-            years = [str(y) for y in years]
-        code = variables[2] if len(variables) > 2 else "Vaatlusperiood"
-        query.append({
-            "code": code,
-            "selection": {"filter": "item", "values": years}
-        })
-
-    payload = {"query": query, "response": {"format": "json"}}
-    url = meta_url
-    res = requests.post(url, json=payload)
-    res.raise_for_status()
-    rows = res.json()["data"]
-
-    # Metaandmete põhjal dimensioonide järjekord
-    opts = get_meta_options("PA103", lang)
-
-    # DataFrame - build rows safely using variable codes coming from metadata
-    records = []
-    for row in rows:
-        # Build mapping from variable code to value (zip will stop at shortest)
-        mapping = dict(zip(variables, row.get("key", [])))
-
-        # Safely extract by variable code with fallbacks to indexed access if present
-        naitaja = mapping.get("Näitaja") or mapping.get("näitaja")
-        if naitaja is None:
-            naitaja = row.get("key", [None])[0] if len(row.get("key", [])) > 0 else None
-
-        tegevusala = mapping.get("Tegevusala") or mapping.get("tegevusala")
-        if tegevusala is None:
-            tegevusala = row.get("key", [None, None])[1] if len(row.get("key", [])) > 1 else None
-
-        aasta = mapping.get("Vaatlusperiood") or mapping.get("aasta")
-        if aasta is None:
-            aasta = row.get("key", [None, None, None])[2] if len(row.get("key", [])) > 2 else None
-
-        raw_val = row.get("values", [None])[0]
-        try:
-            val = float(raw_val) if raw_val not in (None, "", ".", "..", ":") else None
-        except (TypeError, ValueError):
-            val = None
-
-        records.append({
-            "näitaja": naitaja,
-            "tegevusala": tegevusala,
-            "aasta": aasta,
-            "väärtus": val
-        })
-
-    df = pd.DataFrame(records)
-
-    # Lisa inimloetavad nimetused (kasuta metaandmetest saadud keele-spetsiifilisi koode)
-    if len(variables) > 0:
-        ind_code = variables[0]
-    else:
-        ind_code = "Näitaja"
+def get_pa103_data(indicator=None, emtak="TOTAL", years=None, lang="et", fmt=None):
+    """PA103 data by code (näitaja, tegevusala, aasta, väärtus) plus indicator names in `lang`."""
+    return fetch_table("PA103", {"indicator": indicator, "sector": emtak, "period": years}, lang, fmt)
 
-    indicator_map = {opt["value"]: opt["label"] for opt in opts.get(ind_code, [])}
-    df["näitaja_nimi"] = df["näitaja"].map(indicator_map)
-    df["väärtus"] = pd.to_numeric(df["väärtus"], errors="coerce")
 
-    return df
+async def get_pa103_data_async(indicator=None, emtak="TOTAL", years=None, lang="et", fmt=None):
+    """Async variant of get_pa103_data for fan-out queries (see utils.async_client)."""
+    return await fetch_table_async("PA103", {"indicator": indicator, "sector": emtak, "period": years}, lang, fmt)
 
 
 # Layout
 
-def salary_layout(lang="et"):
-
-    # Esialgne demo-graafik (TOTAL, GR_W_AVG, kõik aastad)
-    df = get_pa103_data(indicator="GR_W_AVG", emtak="TOTAL", lang=lang)
-
-    opts = get_meta_options("PA103", lang)
-    #var_codes = list(opts.keys()
+def load_salary_datasets(lang="et"):
+    """Fetch the datasets behind salary_layout: TOTAL series (all years) and all sectors for the latest year."""
+    # Independent steps run concurrently on the async client: metadata (sector list) and
+    # the TOTAL series (esialgne demo-graafik: TOTAL, GR_W_AVG, kõik aastad)
+    opts, df = gather_sync(
+        role_options_async("PA103", lang),
+        get_pa103_data_async(indicator="GR_W_AVG", emtak="TOTAL", lang=lang),
+    )
 
     #võtame kõik emtak väärtused
-    emtak_values = [item["value"] for item in opts["Tegevusala"]]
+    emtak_values = [item["value"] for item in opts["sector"]]
 
     #eemaldame "TOTAL"    
     emtak_values = [v for v in emtak_values if v != "TOTAL"]
     indicator_values = ["GR_W_AVG", "GR_W_D5"]    
 
+    # Only the sector comparison depends on another step: it needs the latest year of the TOTAL series
     latest_year = df["aasta"].max()
 
-    df2 = get_pa103_data(
+    df2 = run_sync(get_pa103_data_async(
         indicator=indicator_values,
         emtak=emtak_values,
         years=latest_year,
-        lang=lang)
+        lang=lang,
+        fmt="json-stat2"))
 
-    # Loo subplot kahe y-telje võimalusega
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig2 = make_subplots(specs=[[{"secondary_y": True}]])
+    return df, df2
 
-    # Võta kõige värskem aasta
-    latest_year = df2["aasta"].max()
-    df2_latest = df2[df2["aasta"] == latest_year]
 
+def sector_comparison_table(df2, opts):
+    """Wide table of average/median per sector, sorted by average, with readable and wrapped labels."""
     # Sorteeri tegevusalad väärtuse järgi
 
     # Aggregate duplicates (if any), then pivot so each tegevusala has avg/med columns
-    df2_agg = df2.groupby(["tegevusala", "näitaja"], as_index=False)["väärtus"].mean()
+    # observed=True: json-stat2 columns are categorical, keep only combinations present in the data
+    df2_agg = df2.groupby(["tegevusala", "näitaja"], as_index=False, observed=True)["väärtus"].mean()
 
     df2_wide = df2_agg.pivot(
         index="tegevusala",
@@ -189,7 +103,8 @@ def salary_layout(lang="et"):
     if activity_key:
         activity_map = {item["value"]: item["label"] for item in opts.get(activity_key, [])}
         # create a human-readable column and replace the kode values for plotting
-        df2_wide_sorted["tegevusala"] = df2_wide_sorted["tegevusala"].map(activity_map).fillna(df2_wide_sorted["tegevusala"])
+        codes = df2_wide_sorted["tegevusala"].astype(str)
+        df2_wide_sorted["tegevusala"] = codes.map(activity_map).fillna(codes)
        
     # Wrap long activity names so they break into multiple lines in the chart.
     def wrap_label(s, width=50):
@@ -202,27 +117,32 @@ def salary_layout(lang="et"):
 
     # Add a wrapped label column and use it for plotting and ordering
     df2_wide_sorted["tegevusala_wrapped"] = df2_wide_sorted["tegevusala"].apply(lambda s: wrap_label(s, width=50))
+    return df2_wide_sorted
+
+
+def salary_datasets(lang="et"):
+    """Last good (df, df2) from load_salary_datasets; the refresher revalidates it in the background."""
+    return refresher.get(("salary", lang), lambda: load_salary_datasets(lang))
+
+
+def salary_comparison_figure(lang="et", df2=None):
+    """Sector comparison (average vs median) for the latest year, populated by its own callback."""
+    if df2 is None:
+        _, df2 = salary_datasets(lang)
+
+    # Võta kõige värskem aasta
+    latest_year = df2["aasta"].max()
+
+    # Wide/sorted/labelled table is computed once per data version and language
+    df2_wide_sorted = materialized(
+        "sector_comparison", df2, lang, lambda: sector_comparison_table(df2, role_options("PA103", lang)))
     order = df2_wide_sorted["tegevusala_wrapped"].tolist()
     #print("order 203",order)
 
-
-    # Lisa keskmise palga tulbad vasakule teljele
-    fig.add_trace(
-        go.Bar(
-            x=df["aasta"],
-            y=df["väärtus"],
-            name=df["näitaja_nimi"].iloc[0],
-            text=df["väärtus"],
-            textposition="inside",
-            textfont=dict(color="white", size=12)
-        ),
-        secondary_y=False
-    )
     # Build fig2 with explicit traces so ordering is deterministic
     #avg_name = translations[lang].get("salary.avg.label", "Keskmine palk")
     avg_name = translations[lang]["salary.label"]
     med_name = translations[lang].get("salary.med.label", "Mediaan palk")
-    #fig.update_yaxes(title_text=translations[lang]["salary.label"], range=[0, None], secondary_y=False)
     avg_trace = go.Bar(
         y=df2_wide_sorted["tegevusala_wrapped"],
         x=df2_wide_sorted.get("GR_W_AVG"),
@@ -260,13 +180,6 @@ def salary_layout(lang="et"):
     fig2 = go.Figure(data=[med_trace, avg_trace])
     fig2.update_layout(barmode="group", legend=dict(traceorder="normal"), bargap=0.2)
     
-    fig.update_layout(
-        barmode="group",
-        title=translations[lang].get("salary_avg_vs_median", "Keskmine vs Mediaan palk tegevusalade kaupa ({year})").format(year=latest_year),
-        xaxis_title=translations[lang]["salary.label"],
-        yaxis_title="Tegevusala"
-    )
-
     # Adjust layout: reduce whitespace between plot and legend and give more
     # vertical room to the bars. We set explicit margins and a taller height,
     # and control legend placement afterwards.
@@ -286,46 +199,163 @@ def salary_layout(lang="et"):
             ticklabelstandoff=10 
         )        
     )
-    #print("order 278", order) 
-
-    # Telgede sätted
-    fig.update_yaxes(title_text=translations[lang]["salary.label"], range=[0, None], secondary_y=False)
-    fig.update_yaxes(title_text=translations[lang]["salarychange"], range=[0, None], secondary_y=True)
-
-    fig.update_yaxes(title_text=translations[lang]["salary.label"], range=[0, None], secondary_y=False)
-
-    # Üldine layout
-    fig.update_layout(
-        title=translations[lang]["salary.title"],
-        height=600
-    )
+    #print("order 278", order)
 
     # Legend alla keskele
     # the plotting area without too much extra whitespace.
     fig2 = apply_common_legend(fig2, "h", -0.04, 0.5)
+    return fig2
+
+
+def salary_layout(lang="et"):
+    # Skeleton only: figures are filled in by update_salary_graph and update_salary_comparison,
+    # so the page renders before any upstream fetch finishes.
 
     # Lehe sisu
     return html.Div([
-        html.H3(translations[lang]["salary_header"]),
+        i18n(html.H3, "salary_header", lang),
         html.Div([
-            html.Label(translations[lang]["indicator.label"]),
+            i18n(html.Label, "indicator.label", lang),
             dcc.Dropdown(id="salary-indicator-dropdown")
         ], style={"width": "30%", "marginBottom": "10px"}),
         html.Div([
-            html.Label(translations[lang]["sector.label"]),
+            i18n(html.Label, "sector.label", lang),
             dcc.Dropdown(id="salary-emtak-dropdown", multi=True)
         ], style={"width": "30%", "marginBottom": "10px"}),
 
         html.Div([
-            html.Label(translations[lang]["year.label"]),
+            i18n(html.Label, "year.label", lang),
             dcc.Dropdown(id="salary-year-dropdown")
         ], style={"width": "30%", "marginBottom": "10px"}),
 
-        dcc.Graph(id="salary-graph", figure=fig),
-        dcc.Graph(id="salary-comparison", figure=fig2),
-        html.P(translations[lang]["salaryNotice"])
+        dcc.Loading(dcc.Graph(id="salary-graph"), type="circle"),
+        dcc.Loading(dcc.Graph(id="salary-comparison"), type="circle"),
+        i18n(html.P, "salaryNotice", lang)
     ])
 
+
+def salary_figure(indicator, emtak, year, lang="et"):
+    """Fetch PA103 data for the given filter state and build the salary-graph figure."""
+    # Kui kasutaja valib "ALL", siis lisa kõik väärtused
+    indicators = None if indicator == "ALL" else indicator
+    years = None if year == "ALL" else year
+
+    df = get_pa103_data(indicator=indicators, emtak=emtak, years=years, lang=lang)
+    return build_salary_figure(df, indicator, lang)
+
+
+def cached_salary_figure(indicator="ALL", emtak="TOTAL", year="ALL", lang="et"):
+    """salary-graph figure for a filter state, cached per PA103 version (defaults = initial filter state)."""
+    key = figure_key("salary", indicator, emtak, year, lang, get_table_version("PA103", lang))
+    return cached_figure(key, lambda: salary_figure(indicator, emtak, year, lang))
+
+
+def cached_comparison_figure(lang="et"):
+    """salary-comparison figure, cached per version of the refresher data it is built from."""
+    _, df2 = salary_datasets(lang)
+    return cached_data_figure(figure_key("comparison", lang), df2, lambda: salary_comparison_figure(lang, df2))
+
+
+def build_salary_figure(df, indicator, lang="et"):
+    """Build the salary-graph figure from already fetched PA103 data."""
+    # plotly.express ja plotly.subplots imporditakse alles joonise ehitamisel (kiirem workeri käivitus)
+    # Kui mõlemad näitajad korraga
+    if indicator is None or indicator == "ALL":
+        from plotly.subplots import make_subplots
+
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+        avg_df = df[df["näitaja"] == "GR_W_AVG"]
+        med_df = df[df["näitaja"] == "GR_W_D5"]
+        dif_df = df[df["näitaja"] == "GR_W_AVG_SM"]
+
+        # Avoid SettingWithCopyWarning by working on copies when we'll modify columns
+        avg_df = avg_df.copy()
+        med_df = med_df.copy()
+        dif_df = dif_df.copy()
+
+        # Helper to get a safe series name
+        def safe_name(df_slice, default_label):
+            try:
+                return df_slice["näitaja_nimi"].iloc[0] if not df_slice.empty else default_label
+            except Exception:
+                return default_label
+
+        avg_name = safe_name(avg_df, translations[lang].get("avg.label", "Average"))
+        med_name = safe_name(med_df, translations[lang].get("med.label", "Median"))
+        dif_name = safe_name(dif_df, translations[lang].get("diff.label", "Difference"))
+
+        # Keskmine ja mediaan vasakule teljele
+        fig.add_trace(
+            go.Bar(
+                x=avg_df["aasta"],
+                y=avg_df["väärtus"],
+                name=avg_name,
+                text=avg_df["väärtus"],
+                textposition="inside",
+                textfont=dict(color="white", size=12)
+            ),
+            secondary_y=False
+        )
+
+        fig.add_trace(
+            go.Bar(
+                x=med_df["aasta"],
+                y=med_df["väärtus"],
+                name=med_name,
+                text=med_df["väärtus"],
+                textposition="inside",
+                textfont=dict(color="white", size=12)
+            ),
+            secondary_y=False
+        )
+
+        # Muutus paremale teljele joonena
+        dif_df["väärtus"] = pd.to_numeric(dif_df["väärtus"], errors="coerce")
+
+        fig.add_trace(
+            go.Scatter(
+                x=dif_df["aasta"],
+                y=dif_df["väärtus"],
+                name=dif_name,
+                mode="lines+markers+text",
+                text=dif_df["väärtus"].round(1),
+                textposition="bottom center"
+            ),
+            secondary_y=True
+        )
+
+        # Telgede sildid
+        fig.update_yaxes(title_text=translations[lang]["salary.label"], secondary_y=False)
+        fig.update_yaxes(range=[0, None], title_text=translations[lang]["salarychange"], secondary_y=True)
+        fig.update_layout(title=translations[lang]["salary.title"], height=600)
+        fig = apply_common_legend(fig, "h", -0.3, 0.5)
+
+    else:
+        # Kui ainult üks näitaja
+        import plotly.express as px
+
+        fig = px.bar(
+            df,
+            x="aasta",
+            y="väärtus",
+            color="näitaja_nimi",
+            barmode="group",
+            text="väärtus",
+            labels={
+                "väärtus": translations[lang]["salary.label"],
+                "aasta": translations[lang]["year.label"],
+                "näitaja_nimi": translations[lang]["indicator.label"]
+            }
+        )
+
+        fig.update_yaxes(range=[0, None])
+
+    # Legend alla keskele
+    fig = apply_common_legend(fig, "h", -0.3, 0.5)
+    return fig
+
+
 # Callbackid
 
 def register_salary_callbacks(app):
@@ -342,21 +372,15 @@ def register_salary_callbacks(app):
         )
     
     def update_salary_filters(pathname, lang):
-        opts = get_meta_options("PA103", lang)
-  
-        # Determine language-specific variable codes from opts keys (order preserved)
-        var_codes = list(opts.keys())
-        ind_code = var_codes[0] if len(var_codes) > 0 else "Näitaja"
-        emtak_code = var_codes[1] if len(var_codes) > 1 else "Tegevusala"
-        year_code = var_codes[2] if len(var_codes) > 2 else "Vaatlusperiood"
+        # Options by dimension role (utils.tables resolves the variable codes from metadata)
+        opts = role_options("PA103", lang)
 
-        indicator_map = {opt["value"]: opt["label"] for opt in opts.get(ind_code, [])}
-        indicator_opts = [{"label": translations[lang]["Allindicator.label"], "value": "ALL"}] + opts.get(ind_code, [])
+        indicator_opts = [{"label": translations[lang]["Allindicator.label"], "value": "ALL"}] + opts["indicator"]
 
         # Add an "All" option that maps to the API's TOTAL code for all sectors
-        emtak_opts = [{"label": translations[lang]["Allemtak.label"], "value": "TOTAL"}] + sorted(opts.get(emtak_code, []), key=lambda x: x.get("label", ""))
+        emtak_opts = [{"label": translations[lang]["Allemtak.label"], "value": "TOTAL"}] + sorted(opts["sector"], key=lambda x: x.get("label", ""))
 
-        year_opts = [{"label": translations[lang]["Allperiod.label"], "value": "ALL"}] + opts.get(year_code, [])
+        year_opts = [{"label": translations[lang]["Allperiod.label"], "value": "ALL"}] + opts["period"]
 
         # Default indicator value: first real option if available
         default_indicator = indicator_opts[0]["value"] if len(indicator_opts) > 1 else indicator_opts[0]["value"]
@@ -383,104 +407,7 @@ def register_salary_callbacks(app):
 
     def update_salary_graph(indicator, emtak, year, lang):
         try:
-            # Kui kasutaja valib "ALL", siis lisa kõik väärtused
-            indicators = None if indicator == "ALL" else indicator
-            years = None if year == "ALL" else year
-
-            df = get_pa103_data(indicator=indicators, emtak=emtak, years=years, lang=lang)
-
-            # Kui mõlemad näitajad korraga
-            if indicator is None or indicator == "ALL":
-
-                fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-                avg_df = df[df["näitaja"] == "GR_W_AVG"]
-                med_df = df[df["näitaja"] == "GR_W_D5"]
-                dif_df = df[df["näitaja"] == "GR_W_AVG_SM"]
-
-                # Avoid SettingWithCopyWarning by working on copies when we'll modify columns
-                avg_df = avg_df.copy()
-                med_df = med_df.copy()
-                dif_df = dif_df.copy()
-
-                # Helper to get a safe series name
-                def safe_name(df_slice, default_label):
-                    try:
-                        return df_slice["näitaja_nimi"].iloc[0] if not df_slice.empty else default_label
-                    except Exception:
-                        return default_label
-
-                avg_name = safe_name(avg_df, translations[lang].get("avg.label", "Average"))
-                med_name = safe_name(med_df, translations[lang].get("med.label", "Median"))
-                dif_name = safe_name(dif_df, translations[lang].get("diff.label", "Difference"))
-
-                # Keskmine ja mediaan vasakule teljele
-                fig.add_trace(
-                    go.Bar(
-                        x=avg_df["aasta"],
-                        y=avg_df["väärtus"],
-                        name=avg_name,
-                        text=avg_df["väärtus"],
-                        textposition="inside",
-                        textfont=dict(color="white", size=12)
-                    ),
-                    secondary_y=False
-                )
-
-                fig.add_trace(
-                    go.Bar(
-                        x=med_df["aasta"],
-                        y=med_df["väärtus"],
-                        name=med_name,
-                        text=med_df["väärtus"],
-                        textposition="inside",
-                        textfont=dict(color="white", size=12)
-                    ),
-                    secondary_y=False
-                )
-
-                # Muutus paremale teljele joonena
-                dif_df["väärtus"] = pd.to_numeric(dif_df["väärtus"], errors="coerce")
-
-                fig.add_trace(
-                    go.Scatter(
-                        x=dif_df["aasta"],
-                        y=dif_df["väärtus"],
-                        name=dif_name,
-                        mode="lines+markers+text",
-                        text=dif_df["väärtus"].round(1),
-                        textposition="bottom center"
-                    ),
-                    secondary_y=True
-                )
-
-                # Telgede sildid
-                fig.update_yaxes(title_text=translations[lang]["salary.label"], secondary_y=False)
-                fig.update_yaxes(range=[0, None], title_text=translations[lang]["salarychange"], secondary_y=True)
-                fig.update_layout(title=translations[lang]["salary.title"], height=600)
-                fig = apply_common_legend(fig, "h", -0.3, 0.5)
-
-            else:
-                # Kui ainult üks näitaja
-                fig = px.bar(
-                    df,
-                    x="aasta",
-                    y="väärtus",
-                    color="näitaja_nimi",
-                    barmode="group",
-                    text="väärtus",
-                    labels={
-                        "väärtus": translations[lang]["salary.label"],
-                        "aasta": translations[lang]["year.label"],
-                        "näitaja_nimi": translations[lang]["indicator.label"]
-                    }
-                )
-
-                fig.update_yaxes(range=[0, None])
-
-            # Legend alla keskele
-            fig = apply_common_legend(fig, "h", -0.3, 0.5)
-            return fig
+            return cached_salary_figure(indicator, emtak, year, lang)
 
         except Exception as e:
             # Log exception server-side and return a simple figure with the error so the client receives a response
@@ -490,48 +417,11 @@ def register_salary_callbacks(app):
             err_fig.update_layout(title=f"Error generating chart: {e}")
             return err_fig
         
-    #@app.callback(
-    #    Output("salary-comparison", "figure"),
-     #   Input("language-dropdown", "value")
-    #)
-    """
-    def update_salary_comparison(lang):
-       
-        opts = get_meta_options("PA103", lang)
-        var_codes = list(opts.keys())
-
-        emtak_code = var_codes[1]["values"]
-         # Andmete päring (nt SQL või API)
-        
-        df2 = get_pa103_data(
-            indicator=["GR_W_AVG","GR_W_D5"],
-            emtak=None,
-            years=None,
-            lang=lang
-            )
-        
-        latest_year = df2["aasta"].max()
-        df2_latest = df2[df2["aasta"] == latest_year]
-
-        # Arvuta keskmine ja mediaan tegevusalade kaupa
-        grouped = df2.groupby("tegevusala")["palk"]
-        keskmised = grouped.mean()
-        mediaanid = grouped.median()
-
-        fig = go.Figure()
-        fig.add_bar(x=keskmised.index, y=keskmised.values, name="Keskmine palk")
-        fig.add_bar(x=mediaanid.index, y=mediaanid.values, name="Mediaan palk")
-
-        fig.update_layout(
-            barmode="group",
-            title=translations[lang]["salary.comparison.title"],
-            xaxis_title=translations[lang]["salary.comparison.xaxis"],
-            yaxis_title=translations[lang]["salary.comparison.yaxis"]
-        )
-        return fig
-        """
-
-
-
-
-
+    # Võrdlusgraafik täidetakse eraldi, et lehe skelett jõuaks brauserisse enne andmeid
+    @app.callback(
+        Output("salary-comparison", "figure"),
+        [Input("salary-comparison", "id"),
+         Input("language-dropdown", "value")]
+    )
+    def update_salary_comparison(_, lang):
+        return cached_comparison_figure(lang or "et")
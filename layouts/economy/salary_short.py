@@ -1,15 +1,60 @@
-import requests
+import os
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from dash import Input, Output, html, dcc
-from translation import translations   # ← import siit
-from utils.helpers import apply_common_legend, get_meta_options
-
-def salary_short_layout(lang="et"):
- 
-    #opts = get_meta_options("PA117", lang)
-    df = get_pa117_data(indicator="GR_W_AVG", county="EE", period=None, lang=lang)
+from dash import Input, Output, ctx, html, dcc
+from dash.exceptions import PreventUpdate
+from components.i18n import i18n
+from utils.cache import TTLCache
+from utils.helpers import apply_common_legend
+from utils.figures import cached_data_figure, figure_key
+from utils.tables import fetch_table, fetch_table_async
+from utils.downsample import downsample, period_timestamps
+from utils.refresher import refresher
+
+# Lühiajastatistika aegrida: kuni SHORT_BAR_MAX_POINTS punkti näidatakse tulpadena, pikem ajalugu
+# WebGL joontena (Scattergl), mis vähendatakse serveris ekraani laiuse järgi (LTTB või min/max)
+SHORT_BAR_MAX_POINTS = int(os.getenv("SHORT_BAR_MAX_POINTS", "200"))
+SHORT_MAX_POINTS = int(os.getenv("SHORT_MAX_POINTS", "2000"))
+SHORT_DOWNSAMPLE = os.getenv("SHORT_DOWNSAMPLE", "lttb")
+SHORT_DEFAULT_WIDTH = 1000
+# Laius ümardatakse, et vahemällu ei tekiks iga pikslilaiuse jaoks eraldi joonist
+_WIDTH_STEP = 250
+# Suumitud joonised on oma väikeses vahemälus, et suumimine ei tõrjuks figure_cache'ist
+# soojendatud algseid jooniseid välja
+SHORT_ZOOM_CACHE_SIZE = int(os.getenv("SHORT_ZOOM_CACHE_SIZE", "16"))
+zoom_cache = TTLCache(maxsize=SHORT_ZOOM_CACHE_SIZE)
+
+
+def short_series(lang="et"):
+    return refresher.get(
+        ("salary_short", lang),
+        lambda: get_pa117_data(indicator="GR_W_AVG", county="EE", period=None, lang=lang))
+
+
+def target_points(width=None):
+    """Punktide arv joone kohta: umbes üks punkt piksli kohta, ümardatud ja piiratud."""
+    width = int(width or SHORT_DEFAULT_WIDTH)
+    width = -(-width // _WIDTH_STEP) * _WIDTH_STEP
+    return max(_WIDTH_STEP, min(width, SHORT_MAX_POINTS))
+
+
+def width_buckets():
+    """Kõik target_points väärtused, mida brauseri laius võib anda (nt soojendamiseks)."""
+    return sorted({target_points(width) for width in range(_WIDTH_STEP, SHORT_MAX_POINTS + _WIDTH_STEP, _WIDTH_STEP)})
+
+
+def salary_short_figure(lang="et", x_range=None, width=None, df=None):
+    if df is None:
+        df = short_series(lang)
+    if len(df) <= SHORT_BAR_MAX_POINTS:
+        return _bar_figure(df)
+    return _timeseries_figure(df, x_range, target_points(width))
+
+
+def _bar_figure(df):
+    from plotly.subplots import make_subplots
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
@@ -24,110 +69,115 @@ def salary_short_layout(lang="et"):
         ),
         secondary_y=False
     )
-    
-    return html.Div([
-        html.H3(translations[lang]["salary_short_header"]),
-        dcc.Graph(id="salary-graph-short", figure=fig),
-        html.P(translations[lang]["salaryNotice"])         
-
-])
-
-def get_pa117_data(indicator=None, county="EE", period=None, lang="et"):
-    meta_url = f"https://andmed.stat.ee/api/v1/{lang}/stat/PA117"
-    meta = requests.get(meta_url).json()
-
-    variables = [v["code"] for v in meta.get("variables", [])]
-    query = []
-
-    if indicator:
-        if isinstance(indicator, str):
-            indicator = [indicator]
-        code = variables[0] if len(variables) > 0 else "Näitaja"
-        query.append({
-            "code": code,
-            "selection": {"filter": "item", "values": indicator}
-        })
-
-    if county:
-        if isinstance(county, str):
-            county = [county]
-        code = variables[1] if len(variables) > 1 else "Maakond"
-        query.append({
-            "code": code,
-            "selection": {"filter": "item", "values": county}
-        })
-
-    #print("Variables:", variables[1])
-    #print("Ja maakond code:", code)  
-    #print("Period:", period)
-
-    if period:
-        if isinstance(period, (int, str)):
-            period = [str(period)]
+    fig.update_layout(uirevision="salary_short")
+    return fig
+
+
+def _timeseries_figure(df, x_range, points):
+    """Üks WebGL joon maakonna kohta, vähendatud `points` punktini nähtavas vahemikus."""
+    fig = go.Figure()
+    for county, group in df.groupby("maakond", observed=True, sort=False):
+        periods = group["vaatlusperiood"].astype(str).to_numpy()
+        values = group["väärtus"].to_numpy(dtype=float)
+        # x-telg on alati kuupäevad: suumi vahemik on siis sama kõigi (ka vähendatud) joonte jaoks.
+        # Kategoorilisel teljel oleks vahemik kuvatud punktide indeksites, mis ei vasta algreale.
+        x = period_timestamps(periods)
+        position = x.asi8.astype(float)
+
+        if x_range is not None:
+            low, high = (pd.Timestamp(v).value for v in x_range)
+            inside = np.flatnonzero((position >= float(low)) & (position <= float(high)))
+            # Üks punkt mõlemal pool vahemikku, et joon ulatuks servani
+            inside = np.arange(max(inside[0] - 1, 0), min(inside[-1] + 2, len(position))) if len(inside) else inside
         else:
-            period = [str(p) for p in period]
-        code = variables[2] if len(variables) > 2 else "Vaatlusperiood"
-        query.append({
-        "code": code,
-        "selection": {"filter": "item", "values": period}
-    })
-        
-    #print("Ja periood code:", code)
-    #print("Query:", query)
-
-    payload = {"query": query, "response": {"format": "json"}}
-    url = meta_url
-
-    #print("Payload:", payload)
-    res = requests.post(url, json=payload)
-    res.raise_for_status()
-    rows = res.json()["data"]
-        
-    # Metaandmete põhjal dimensioonide järjekord
-    opts = get_meta_options("PA117", lang)
-    records = []
-
-    for row in rows:
-        # Build mapping from variable code to value (zip will stop at shortest)
-        mapping = dict(zip(variables, row.get("key", [])))
-
-        # Safely extract by variable code with fallbacks to indexed access if present
-        naitaja = mapping.get("Näitaja") or mapping.get("näitaja")
-        if naitaja is None:
-            naitaja = row.get("key", [None])[0] if len(row.get("key", [])) > 0 else None
-
-        maakond = mapping.get("Maakond") or mapping.get("maakond")
-        if maakond is None:
-            maakond = row.get("key", [None, None])[1] if len(row.get("key", [])) > 1 else None
-
-        periood = mapping.get("Vaatlusperiood") or mapping.get("vaatlusperiood")
-        if periood is None:
-            periood = row.get("key", [None, None, None])[2] if len(row.get("key", [])) > 2 else None
-
-        raw_val = row.get("values", [None])[0]
-        try:
-            val = float(raw_val) if raw_val not in (None, "", ".", "..", ":") else None
-        except (TypeError, ValueError):
-            val = None
-
-        records.append({
-            "näitaja": naitaja,
-            "maakond": maakond,
-            "vaatlusperiood": periood,
-            "väärtus": val
-        })    
-
-    df = pd.DataFrame(records)
-    #print("Salary shortterm options:", variables)
-
-    # Lisa inimloetavad nimetused (kasuta metaandmetest saadud keele-spetsiifilisi koode)
-    if len(variables) > 0:
-        ind_code = variables[0]
-    else:
-        ind_code = "Näitaja"
-
-    indicator_map = {opt["value"]: opt["label"] for opt in opts.get(ind_code, [])}
-    df["näitaja_nimi"] = df["näitaja"].map(indicator_map)
-    df["väärtus"] = pd.to_numeric(df["väärtus"], errors="coerce")
-
-    return df
\ No newline at end of file
+            inside = np.arange(len(position))
+
+        picked = inside[downsample(position[inside], values[inside], points, SHORT_DOWNSAMPLE)]
+        fig.add_trace(go.Scattergl(
+            x=x[picked],
+            y=values[picked],
+            mode="lines",
+            name=group["maakond_nimi"].iloc[0] if "maakond_nimi" in group else str(county),
+        ))
+
+    fig.update_layout(
+        title=df["näitaja_nimi"].iloc[0] if len(df) else None,
+        # uirevision hoiab kasutaja suumi alles, kui joonis asendatakse täpsemaga
+        uirevision="salary_short",
+        xaxis=dict(range=list(x_range)) if x_range is not None else {},
+    )
+    return fig
+
+
+def zoom_range(relayout):
+    """
+    relayoutData -> (x-telje vahemik või None, kas tegu oli suumi/lähtestamisega).
+    Muud muutused (nt autosize) ei vaja uut joonist.
+    """
+    if not relayout:
+        return None, False
+    if "xaxis.range[0]" in relayout:
+        return (relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]), True
+    if "xaxis.range" in relayout:
+        return tuple(relayout["xaxis.range"]), True
+    if relayout.get("xaxis.autorange"):
+        return None, True
+    return None, False
+
+
+def salary_short_layout(lang="et"):
+    # Skeleton only, the figure is filled in by update_salary_short_graph
+    return html.Div([
+        i18n(html.H3, "salary_short_header", lang),
+        dcc.Loading(dcc.Graph(id="salary-graph-short"), type="circle"),
+        dcc.Store(id="salary-short-width"),
+        i18n(html.P, "salaryNotice", lang)
+    ])
+
+
+def cached_salary_short_figure(lang="et", x_range=None, width=None):
+    """salary-graph-short figure, cached per version of the refresher data, zoom range and point budget."""
+    df = short_series(lang)
+    if len(df) <= SHORT_BAR_MAX_POINTS:
+        # Lühike rida näidatakse tervikuna tulpadena, suum ja laius ei muuda joonist
+        x_range, width = None, None
+    key = figure_key("salary_short", lang, x_range, target_points(width))
+    return cached_data_figure(key, df, lambda: salary_short_figure(lang, x_range, width, df),
+                              zoom_cache if x_range is not None else None)
+
+
+def register_salary_short_callbacks(app):
+    # Brauseri akna laius määrab, mitu punkti joone kohta on mõtet saata
+    app.clientside_callback(
+        """
+        function(id) {
+            return window.innerWidth;
+        }
+        """,
+        Output("salary-short-width", "data"),
+        Input("salary-graph-short", "id")
+    )
+
+    @app.callback(
+        Output("salary-graph-short", "figure"),
+        [Input("salary-graph-short", "id"),
+         Input("language-dropdown", "value"),
+         Input("salary-graph-short", "relayoutData"),
+         Input("salary-short-width", "data")]
+    )
+    def update_salary_short_graph(_, lang, relayout, width):
+        x_range, zoomed = zoom_range(relayout)
+        # Suumimine/lähtestamine toob vahemiku täpsemalt; muud relayout sündmused jäetakse vahele
+        if "salary-graph-short.relayoutData" in ctx.triggered_prop_ids and not zoomed:
+            raise PreventUpdate
+        return cached_salary_short_figure(lang or "et", tuple(x_range) if x_range else None, width)
+
+
+def get_pa117_data(indicator=None, county="EE", period=None, lang="et", fmt=None):
+    """PA117 data by code (näitaja, maakond, vaatlusperiood, väärtus) plus indicator names in `lang`."""
+    return fetch_table("PA117", {"indicator": indicator, "region": county, "period": period}, lang, fmt)
+
+
+async def get_pa117_data_async(indicator=None, county="EE", period=None, lang="et", fmt=None):
+    """Async variant of get_pa117_data for fan-out queries (see utils.async_client)."""
+    return await fetch_table_async("PA117", {"indicator": indicator, "region": county, "period": period}, lang, fmt)
@@ -1,9 +1,11 @@
 from dash import html
-from translation import translations   # ← import siit
+from components.i18n import i18n
 
+# Andmed: utils.tables.fetch_table(<tabeli kood>, {roll: väärtus(ed)}, lang) annab keskkonnatabelile
+# sama vahemälu, peegli ja kiire dekodeerimise; uue tabeli rollid saab kirjeldada utils.tables.TABLES-is.
 def envirstatus_layout(lang="et"):
 
  return html.Div([
-        html.H3(translations[lang]["envirstatus_header"]),
+        i18n(html.H3, "envirstatus_header", lang),
 
 ])
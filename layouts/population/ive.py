@@ -1,13 +1,15 @@
 from dash import html
-from translation import translations   # ← import siit
+from components.i18n import i18n
 
 ive_layout = html.Div([
     html.H3("Rahvastikustatistika – tulekul")
 ])
 
+# Andmed: utils.tables.fetch_table(<tabeli kood>, {roll: väärtus(ed)}, lang) annab rahvastikutabelile
+# sama vahemälu, peegli ja kiire dekodeerimise; uue tabeli rollid saab kirjeldada utils.tables.TABLES-is.
 def ive_layout(lang="et"):
 
  return html.Div([
-        html.H3(translations[lang]["ive_header"]),
+        i18n(html.H3, "ive_header", lang),
 
 ])
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Asünkroonne andmekiht stat.ee API jaoks (httpx, piiratud ühenduste arv).
+
+Päringud läbivad sama koodi mis utils.stat_client: identsete päringute ühendamine (ka
+samaaegsete sünkroonsetega), ETag/Last-Modified validaatorid, päringute loendur ja /metrics.
+Sünkroonsest callback'ist kasutatakse run_sync/gather_sync kaudu (nt load_salary_datasets).
+"""
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+
+from utils import stat_client
+from utils.helpers import cached_table_meta, meta_options, store_table_meta
+from utils.stat_client import DEFAULT_FORMAT, POOL_SIZE, TIMEOUT
+from utils.workers import threads_allowed
+
+
+# Samaaegsete ühenduste piirang asünkroonsele kliendile (vaikimisi sama mis sünkroonse kogumi suurus)
+ASYNC_MAX_CONNECTIONS = int(os.getenv("STAT_API_ASYNC_CONNECTIONS", str(POOL_SIZE)))
+
+# httpx.AsyncClient on seotud sündmustsükliga, seega hoiame ühte klienti tsükli kohta
+_clients = weakref.WeakKeyDictionary()
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_CONNECTIONS,
+        )
+        client = httpx.AsyncClient(limits=limits, timeout=TIMEOUT)
+        _clients[loop] = client
+    return client
+
+
+async def get_json_async(table: str, lang: str = "et") -> dict:
+    return await stat_client.get_json_async(get_async_client(), table, lang)
+
+
+async def post_json_async(table: str, payload: dict, lang: str = "et") -> dict:
+    return await stat_client.post_json_async(get_async_client(), table, payload, lang)
+
+
+async def get_table_meta_async(table="PA103", lang="et"):
+    """Asünkroonne get_table_meta; kasutab sama metaandmete vahemälu."""
+    meta = cached_table_meta(table, lang)
+    if meta is None:
+        meta = await get_json_async(table, lang)
+        store_table_meta(table, lang, meta)
+    return meta
+
+
+async def get_meta_options_async(table="PA103", lang="et"):
+    return meta_options(await get_table_meta_async(table, lang))
+
+
+async def fetch_data_async(table: str, query: list, lang: str = "et", fmt: str = None) -> dict:
+    """Asünkroonne utils.fetch_data.fetch_data."""
+    payload = {
+        "query": query,
+        "response": {"format": fmt or DEFAULT_FORMAT}
+    }
+    return await post_json_async(table, payload, lang)
+
+
+# Sünkroonne fassaad
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Protsessi ühine sündmustsükkel taustalõimes (luuakse pärast fork'i uuesti)."""
+    global _loop, _loop_pid
+    pid = os.getpid()
+    if _loop is None or _loop_pid != pid:
+        with _loop_lock:
+            if _loop is None or _loop_pid != pid:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="stat-async-loop", daemon=True).start()
+                _loop = loop
+                _loop_pid = pid
+    return _loop
+
+
+async def _closing(coro):
+    # Ühekordse tsükli lõpus suletakse selle httpx klient (tsükkel suletakse pärast asyncio.run'i)
+    try:
+        return await coro
+    finally:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+def run_sync(coro):
+    """Käivitab korutiini taustatsüklis ja ootab tulemust (sobib sünkroonsest Dash callback'ist)."""
+    if not threads_allowed():
+        # utils.workers.inline (soojendus gunicorn'i masteris): tsükkel kutsuja lõimes, ilma taustalõimeta
+        return asyncio.run(_closing(coro))
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+def gather_sync(*coros):
+    """
+    Käivitab mitu päringut samaaegselt ja tagastab tulemused samas järjekorras, nt
+
+        totals, sectors = gather_sync(
+            get_pa103_data_async(indicator="GR_W_AVG", emtak="TOTAL"),
+            get_pa103_data_async(indicator=["GR_W_AVG", "GR_W_D5"], emtak=sectors, years="2023"),
+        )
+    """
+    async def _gather():
+        return await asyncio.gather(*coros)
+    return run_sync(_gather())
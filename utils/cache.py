@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Lõimekindel LRU vahemälu, mille kirjed aeguvad `ttl` sekundi järel.
+
+    :param maxsize: maksimaalne kirjete arv, üle selle visatakse välja kõige kauem kasutamata kirje
+    :param ttl: kirje eluiga sekundites (None = ei aegu)
+    :param max_weight: kirjete kaalude (set(..., weight=)) ülempiir, nt baitides (None = ei piirata)
+    """
+
+    def __init__(self, maxsize=128, ttl=None, max_weight=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weight = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expired(item[1]):
+                if item is not None:
+                    self._pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def _pop(self, key):
+        self.weight -= self._data.pop(key)[2]
+
+    def set(self, key, value, weight=0):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, time.monotonic(), weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (
+                    self.max_weight is not None and self.weight > self.max_weight and len(self._data) > 1):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def get_or_set(self, key, factory):
+        """Tagastab vahemälus oleva väärtuse või arvutab selle `factory()` abil ja salvestab."""
+        _missing = object()
+        value = self.get(key, _missing)
+        if value is _missing:
+            # factory() jookseb lukust väljas, et aeglane päring ei blokeeriks teisi võtmeid
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=None):
+        """Eemaldab ühe kirje või (key=None korral) kogu sisu."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self.weight = 0
+            elif key in self._data:
+                self._pop(key)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+            if self.max_weight is not None:
+                stats.update(weight=self.weight, max_weight=self.max_weight)
+            return stats
@@ -0,0 +1,75 @@
+import threading
+
+from flask import g, request
+from flask_compress import Compress
+
+
+# Dash callback'ide ja layout'i vastused on JSON, joonised võivad olla sadu kilobaite
+COMPRESS_MIMETYPES = ["application/json", "text/html", "text/css", "text/javascript", "application/javascript"]
+
+_stats = {}
+_lock = threading.Lock()
+
+
+def use_fast_json():
+    """Kasuta plotly jooniste serialiseerimiseks orjson'it, kui see on paigaldatud."""
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    import plotly.io as pio
+    pio.json.config.default_engine = "orjson"
+    return True
+
+
+def _payload_label():
+    if request.path.endswith("/_dash-update-component"):
+        body = request.get_json(silent=True) or {}
+        return body.get("output", "callback")
+    if request.path.endswith("/_dash-layout"):
+        return "layout"
+    return None
+
+
+def init_compression(server):
+    """
+    Lülitab sisse brotli/gzip tihendamise ja mõõdab iga callback'i vastuse suurust
+    enne (raw_bytes) ja pärast (wire_bytes) tihendamist.
+    """
+    server.config.setdefault("COMPRESS_MIMETYPES", COMPRESS_MIMETYPES)
+    server.config.setdefault("COMPRESS_ALGORITHM", ["br", "gzip"])
+    server.config.setdefault("COMPRESS_MIN_SIZE", 500)
+
+    # after_request funktsioonid käivituvad vastupidises järjekorras:
+    # see registreeritakse enne Compress'i, seega näeb juba tihendatud vastust
+    @server.after_request
+    def _record_wire_size(response):
+        label = g.pop("payload_label", None)
+        if label is not None:
+            raw = g.pop("payload_raw_bytes", 0)
+            wire = response.calculate_content_length() or raw
+            with _lock:
+                entry = _stats.setdefault(label, {"count": 0, "raw_bytes": 0, "wire_bytes": 0})
+                entry["count"] += 1
+                entry["raw_bytes"] += raw
+                entry["wire_bytes"] += wire
+        return response
+
+    Compress(server)
+
+    @server.after_request
+    def _record_raw_size(response):
+        label = _payload_label()
+        if label is not None and not response.direct_passthrough:
+            g.payload_label = label
+            g.payload_raw_bytes = len(response.get_data())
+        return response
+
+    use_fast_json()
+    return server
+
+
+def payload_stats():
+    """Vastuste arv ja baitide summa callback'i väljundi (või "layout") kaupa."""
+    with _lock:
+        return {label: dict(entry) for label, entry in _stats.items()}
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import time
+
+import pandas as pd
+
+from utils.async_client import fetch_data_async, get_table_meta_async
+from utils.cache import TTLCache
+from utils.decode import concat_frames
+from utils.fetch_data import fetch_data, plan_chunks
+from utils.helpers import get_table_meta
+from utils.mirror import query_mirror
+from utils.stat_client import DEFAULT_FORMAT
+from utils.workers import CHUNK_WORKERS, chunk_pool, fetch_pool
+
+
+# Väärtuste koodid (GR_W_AVG, TOTAL, EMTAK, aastad) on keelest sõltumatud, seega tuuakse
+# numbrid alati ühest keeleversioonist ja nimetused lisatakse lugemisel soovitud keele metaandmetest
+DATA_LANG = os.getenv("STAT_DATA_LANG", "et")
+
+# Kirje kehtib seni, kuni tabeli versioon (metaandmete "updated") on sama. Metaandmed ise
+# uuendatakse STAT_META_TTL järel (tingimusliku päringuga), nii et täis andmepäring tehakse
+# uuesti ainult siis, kui tabel on tegelikult muutunud. Kui API versiooni ei anna, kehtib DATA_TTL.
+DATA_TTL = int(os.getenv("STAT_DATA_TTL", "3600"))
+CUBE_CACHE_SIZE = int(os.getenv("STAT_CUBE_CACHE_SIZE", "64"))
+cube_cache = TTLCache(maxsize=CUBE_CACHE_SIZE)
+
+
+def _cube_key(table, filters, fmt):
+    normalized = {col: list(values) if values else None for col, values in filters.items()}
+    return (table, json.dumps(normalized, sort_keys=True, ensure_ascii=False), fmt)
+
+
+def _cached(key, version):
+    entry = cube_cache.get(key)
+    if entry is None:
+        return None
+    if version is not None:
+        return entry["df"] if entry["version"] == version else None
+    return entry["df"] if time.monotonic() - entry["fetched_at"] < DATA_TTL else None
+
+
+def _store(key, df, version):
+    df["väärtus"] = pd.to_numeric(df["väärtus"], errors="coerce")
+    # Märgi andmed tabeli versiooni ja toomise ajaga (tuletatud vaadete võti, vt utils.views)
+    df.attrs["table_version"] = version
+    df.attrs["fetched_at"] = time.time()
+    cube_cache.set(key, {"df": df, "version": version, "fetched_at": time.monotonic()})
+    return df
+
+
+def _merge(frames):
+    # Osad tulevad plan_chunks järjekorras; dimensiooniveergude (metaandmete järjekorras
+    # kategoorilised veerud) järgi sorteerides taastub kuubi järjekord
+    first = frames[0]
+    return concat_frames(frames, [c for c in first.columns if isinstance(first[c].dtype, pd.CategoricalDtype)])
+
+
+def _fetch(table, query, meta, fmt, decode):
+    """Toob andmed API-st; lahtrite piiri ületav päring tehakse osade kaupa paralleelselt (chunk_pool)."""
+    chunks = plan_chunks(query, meta)
+    if len(chunks) == 1:
+        return decode(fetch_data(table, query, DATA_LANG, fmt), fmt, meta)
+    futures = [chunk_pool().submit(fetch_data, table, chunk, DATA_LANG, fmt) for chunk in chunks]
+    return _merge([decode(f.result(), fmt, meta) for f in futures])
+
+
+async def _fetch_async(table, query, meta, fmt, decode):
+    chunks = plan_chunks(query, meta)
+    if len(chunks) == 1:
+        return decode(await fetch_data_async(table, query, DATA_LANG, fmt), fmt, meta)
+    limit = asyncio.Semaphore(CHUNK_WORKERS)
+
+    async def fetch_chunk(chunk):
+        async with limit:
+            return await fetch_data_async(table, chunk, DATA_LANG, fmt)
+
+    responses = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    return _merge([decode(data, fmt, meta) for data in responses])
+
+
+def get_cube(table, build_query, decode, fmt=None):
+    """
+    Keelest sõltumatu numbriline andmekuup (ainult koodid ja väärtused), vahemälus tabeli versiooni kaupa.
+
+    :param build_query: funktsioon (metaandmed) -> (API päring, veerufiltrid)
+    :param decode: funktsioon (vastus, formaat, metaandmed) -> DataFrame
+    :return: DataFrame; kutsuja ei tohi seda muuta (jagatud vahemäluga)
+    """
+    meta = get_table_meta(table, DATA_LANG)
+    query, filters = build_query(meta)
+    fmt = fmt or DEFAULT_FORMAT
+
+    key = _cube_key(table, filters, fmt)
+    version = meta.get("updated")
+    df = _cached(key, version)
+    if df is None:
+        # Kohalik peegel (python -m utils.mirror) vastab filtritele kettalt ilma API päringuta,
+        # kui see on sünkroniseeritud tabeli praegusest versioonist
+        df = query_mirror(table, DATA_LANG, filters, version)
+        if df is None:
+            df = _fetch(table, query, meta, fmt, decode)
+        df = _store(key, df, version)
+    return df
+
+
+async def get_cube_async(table, build_query, decode, fmt=None):
+    """Asünkroonne get_cube, sama vahemäluga."""
+    meta = await get_table_meta_async(table, DATA_LANG)
+    query, filters = build_query(meta)
+    fmt = fmt or DEFAULT_FORMAT
+
+    key = _cube_key(table, filters, fmt)
+    version = meta.get("updated")
+    df = _cached(key, version)
+    if df is None:
+        # Parquet'i lugemine blokeeriks sündmustsüklit, seega tehakse see lõimekogumis
+        df = await asyncio.wrap_future(fetch_pool().submit(query_mirror, table, DATA_LANG, filters, version))
+        if df is None:
+            df = await _fetch_async(table, query, meta, fmt, decode)
+        df = _store(key, df, version)
+    return df
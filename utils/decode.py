@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+def _category_codes(dimension: dict) -> list:
+    """JSON-stat2 dimensiooni väärtuskoodid nende järjekorras."""
+    category = dimension["category"]
+    index = category.get("index")
+    if index is None:
+        return list(category.get("label", {}).keys())
+    if isinstance(index, dict):
+        return sorted(index, key=index.get)
+    return list(index)
+
+
+def _dense_values(values, size: int) -> np.ndarray:
+    """Teisendab JSON-stat2 väärtused tihedaks float massiiviks (puuduvad -> NaN)."""
+    if isinstance(values, dict):
+        # hõre kuju {"indeks": väärtus}
+        out = np.full(size, np.nan)
+        if values:
+            idx = np.fromiter((int(k) for k in values.keys()), dtype=np.int64, count=len(values))
+            out[idx] = pd.to_numeric(pd.Series(list(values.values())), errors="coerce").to_numpy(dtype=float)
+        return out
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+def decode_jsonstat2(data: dict, columns: list, value_column: str = "väärtus") -> pd.DataFrame:
+    """
+    Dekodeerib JSON-stat2 vastuse otse NumPy massiivideks ilma ridade kaupa tsüklita.
+
+    :param data: API vastus formaadis "json-stat2"
+    :param columns: väljundveergude nimed dimensioonide järjekorras (nt ["näitaja", "tegevusala", "aasta"])
+    :param value_column: väärtuste veeru nimi
+    :return: DataFrame, kus dimensioonid on järjestatud kategoorilised veerud koodidega
+    """
+    ids = data["id"]
+    sizes = [int(s) for s in data["size"]]
+    total = int(np.prod(sizes)) if sizes else 0
+
+    frame = {}
+    for i, dim_id in enumerate(ids):
+        codes = _category_codes(data["dimension"][dim_id])
+        inner = int(np.prod(sizes[i + 1:]))
+        outer = int(np.prod(sizes[:i]))
+        positions = np.tile(np.repeat(np.arange(sizes[i]), inner), outer)
+        name = columns[i] if i < len(columns) else dim_id
+        # ordered=True, et .max() annaks viimase perioodi nagu stringide puhul
+        frame[name] = pd.Categorical.from_codes(positions, categories=codes, ordered=True)
+
+    frame[value_column] = _dense_values(data.get("value", []), total)
+    return pd.DataFrame(frame)
+
+
+def decode_rows(data: dict, columns: list, value_column: str = "väärtus") -> pd.DataFrame:
+    """
+    Dekodeerib "json" vastuse (read kujul {"key": [...], "values": [...]}) sama kujuga tabeliks
+    nagu decode_jsonstat2: järjestatud kategoorilised koodiveerud ja numbriline väärtuste veerg.
+    """
+    rows = data.get("data", [])
+    frame = pd.DataFrame([row["key"] for row in rows], columns=columns) if rows else pd.DataFrame(columns=columns)
+    for name in columns:
+        # Read on kuubi järjekorras, seega esmakordse esinemise järjekord = metaandmete järjekord
+        frame[name] = pd.Categorical(frame[name], categories=pd.unique(frame[name]), ordered=True)
+    frame[value_column] = pd.to_numeric(pd.Series([row["values"][0] for row in rows], dtype=object),
+                                        errors="coerce").to_numpy(dtype=float)
+    return frame
+
+
+def concat_frames(frames: list, sort_columns: list = ()) -> pd.DataFrame:
+    """
+    Liidab sama kujuga osatabelid (nt päringu osad) järjekorras kokku. Kategooriliste veergude
+    kategooriad ühendatakse esinemise järjekorras; `sort_columns` järgi taastatakse kuubi järjekord.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    columns = {}
+    for name in frames[0].columns:
+        if isinstance(frames[0][name].dtype, pd.CategoricalDtype):
+            columns[name] = union_categoricals([f[name] for f in frames], ignore_order=True).as_ordered()
+        else:
+            columns[name] = np.concatenate([f[name].to_numpy() for f in frames])
+    df = pd.DataFrame(columns)
+    if sort_columns:
+        df = df.sort_values(list(sort_columns), kind="stable", ignore_index=True)
+    return df
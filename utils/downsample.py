@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: valib `threshold` punkti, mis säilitavad aegrea kuju
+    (tipud ja langused jäävad alles). Tagastab valitud punktide indeksid kasvavas järjekorras.
+
+    :param x: kasvav numbriline massiiv (nt aeg nanosekundites)
+    :param y: väärtused (NaN-id tuleb enne eemaldada)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Esimene ja viimane punkt jäävad alati, ülejäänud jagatakse threshold - 2 ämbrisse
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Järgmise ämbri keskmine (viimase ämbri järel on ainult viimane punkt)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x, y, threshold):
+    """
+    Min/max vähendamine: esimene ja viimane punkt ning vahepealsete punktide iga ämbri
+    ((threshold - 2) // 2 ämbrit) väikseim ja suurim punkt, kokku kuni `threshold` punkti.
+    Kiirem kui LTTB ja säilitab kindlasti äärmused; tagastab indeksid kasvavas järjekorras.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    buckets = (threshold - 2) // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+
+    # Otspunktid on eelarve sees, ämbrid katavad ainult vahepealsed punktid
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    starts = edges[:-1]
+    lows = starts + np.array([np.argmin(y[s:e]) for s, e in zip(starts, edges[1:])])
+    highs = starts + np.array([np.argmax(y[s:e]) for s, e in zip(starts, edges[1:])])
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample(x, y, threshold, method="lttb"):
+    """Vähendab punktide arvu kuni `threshold`-ni, puuduvad väärtused jäetakse välja. Tagastab indeksid."""
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    picked = METHODS[method](np.asarray(x, dtype=float)[valid], y[valid], threshold)
+    return valid[picked]
+
+
+def period_timestamps(codes):
+    """
+    Perioodikoodid ("2023", "2023Q1", "2023M01", "2023-01") -> pd.Timestamp perioodi algusega.
+
+    :raises ValueError: kui mõnda koodi ei õnnestu tõlgendada
+    """
+    parsed = {}
+    for code in pd.unique(np.asarray(codes, dtype=object)):
+        text = str(code).strip().upper().replace("M", "-")
+        try:
+            parsed[code] = pd.Period(text).start_time
+        except ValueError as e:
+            raise ValueError(f"tundmatu perioodikood: {code!r}") from e
+    return pd.DatetimeIndex([parsed[c] for c in codes])
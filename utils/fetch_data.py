@@ -1,24 +1,76 @@
-import pandas as pd
-import requests
+import os
 
+from utils.stat_client import DEFAULT_FORMAT, post_json
 
-def fetch_data(table: str, query: list, lang: str = "et"): #-> pd.DataFrame:
+
+# API lubab ühes vastuses piiratud arvu lahtreid; suuremad päringud jagatakse osadeks (plan_chunks)
+CELL_LIMIT = int(os.getenv("STAT_API_CELL_LIMIT", "100000"))
+
+
+def fetch_data(table: str, query: list, lang: str = "et", fmt: str = None) -> dict:
     """
     Üldine andmete tõmbamise funktsioon Statistikaameti API-st.
-    
+
     :param table: tabeli kood (nt "PA103")
     :param query: päringu filterite list (API formaadis)
     :param lang: "et" või "en" – API keeleversioon
-    :return: pandas DataFrame toorandmetega
+    :param fmt: vastuse formaat, "json" (read) või "json-stat2" (tihe massiiv); vaikimisi STAT_API_FORMAT
+    :return: API vastus (dekodeerimine: utils.tables.decode_response)
     """
-    #print("PA103 query:", query)
-
-    url = f"https://andmed.stat.ee/api/v1/{lang}/stat/{table}"
     payload = {
         "query": query,
-        "response": {"format": "json"}
+        "response": {"format": fmt or DEFAULT_FORMAT}
     }
-    res = requests.post(url, json=payload)
-    res.raise_for_status()
-    return res.json()["data"]
+    return post_json(table, payload, lang)
+
+
+def _selections(query: list, meta: dict) -> dict:
+    """Iga muutuja valitud väärtused; None = päringust välja jäetud ja elimineeritav (1 lahter)."""
+    by_code = {q["code"]: q for q in query}
+    selected = {}
+    for v in meta.get("variables", []):
+        q = by_code.get(v["code"])
+        if q is None:
+            selected[v["code"]] = None if v.get("elimination") else list(v["values"])
+        elif q["selection"]["filter"] == "item":
+            selected[v["code"]] = list(q["selection"]["values"])
+        else:
+            selected[v["code"]] = list(v["values"])
+    return selected
+
+
+def estimate_cells(query: list, meta: dict) -> int:
+    """Vastuse lahtrite arv metaandmete väärtuste arvu põhjal."""
+    cells = 1
+    for values in _selections(query, meta).values():
+        cells *= len(values) if values else 1
+    return cells
+
+
+def plan_chunks(query: list, meta: dict, limit: int = None) -> list:
+    """
+    Jagab päringu osadeks, mille lahtrite arv on kuni `limit` (vaikimisi STAT_API_CELL_LIMIT).
+    Jagatakse kõige rohkemate väärtustega dimensiooni järgi, vajadusel rekursiivselt ka järgmise
+    järgi. Osad on metaandmete järjekorras, nii et nende tulemused saab järjest kokku liita.
+    """
+    limit = CELL_LIMIT if limit is None else limit
+    cells = estimate_cells(query, meta)
+    if limit <= 0 or cells <= limit:
+        return [query]
+
+    selected = _selections(query, meta)
+    splittable = [code for code, values in selected.items() if values and len(values) > 1]
+    if not splittable:
+        return [query]
+    code = max(splittable, key=lambda c: len(selected[c]))
+    values = selected[code]
+    step = max(1, limit // (cells // len(values)))
 
+    chunks = []
+    for start in range(0, len(values), step):
+        part = {"code": code, "selection": {"filter": "item", "values": values[start:start + step]}}
+        chunk = [part if q["code"] == code else q for q in query]
+        if part not in chunk:
+            chunk.append(part)
+        chunks.extend(plan_chunks(chunk, meta, limit))
+    return chunks
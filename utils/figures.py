@@ -0,0 +1,31 @@
+import os
+
+from utils.cache import TTLCache
+from utils.views import data_version
+
+
+# Valmis (serialiseeritud) jooniste LRU vahemälu; võti sisaldab filtreid, keelt ja andmete versiooni
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", "128"))
+figure_cache = TTLCache(maxsize=FIGURE_CACHE_SIZE)
+
+
+def figure_key(*parts):
+    """Teeb filtrite väärtustest räsitava võtme (listid -> tuple)."""
+    return tuple(tuple(p) if isinstance(p, list) else p for p in parts)
+
+
+def cached_figure(key, build, cache=None):
+    """Tagastab joonise sõnastiku vahemälust (vaikimisi figure_cache) või ehitab selle `build()` abil ja salvestab."""
+    return (cache or figure_cache).get_or_set(key, lambda: build().to_dict())
+
+
+def cached_data_figure(key, df, build, cache=None):
+    """
+    Nagu cached_figure, kuid võtmesse lisatakse joonise aluseks olevate andmete `df` versioon
+    (utils.views.data_version), mitte metaandmete praegune versioon: taustal värskendatavad
+    andmed võivad metaandmetest maha jääda. Märketa andmete korral ehitatakse joonis iga kord.
+    """
+    version = data_version(df)
+    if version is None:
+        return build().to_dict()
+    return cached_figure((*key, version), build, cache)
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def normalize_prompt(text: str) -> str:
+    """Väiketähed, ühtlustatud tühikud, ilma lõpumärkideta – "Mis on palk? " == "mis on  palk"."""
+    text = re.sub(r"\s+", " ", (text or "").strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def prompt_key(text: str, model: str, lang: str) -> str:
+    raw = "\x1f".join([model, lang or "", normalize_prompt(text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Püsiv (SQLite) vastuste vahemälu TTL-i ja suuruspiiranguga.
+    Üle `max_entries` kirje korral visatakse välja kõige kauem kasutamata kirjed.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=5000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _db(self):
+        # SQLite ühendus ei tohi fork'i üle minna, seega üks ühendus protsessi kohta
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT NOT NULL,"
+                " created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    db.commit()
+                self.misses += 1
+                return None
+            db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._db().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "size": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+            }
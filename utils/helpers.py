@@ -1,39 +1,95 @@
-import requests
 import logging
 #from pathlib import Path
 #from dotenv import load_dotenv, find_dotenv
 
 import os
-from openai import OpenAI, api_key
-from typing import Optional
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from utils.cache import TTLCache
+from utils.gpt_cache import ResponseCache, prompt_key
+from utils.jobs import JobQueue
+from utils.stat_client import get_json
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 _log = logging.getLogger(__name__)
-_client: Optional[OpenAI] = None
+# OpenAI klient (ja openai pakett) luuakse alles esimese GPT päringu ajal, et workerid käivituksid
+# kiiremini ja töölaud töötaks ka ilma OPENAI_API_KEY-ta
+_client: Optional["OpenAI"] = None
+_client_lock = threading.Lock()
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# GPT päringud jooksevad eraldi piiratud lõimekogumis, et need ei blokeeriks graafikute callback'e.
+# Tööde olek on jagatud SQLite failis, et oleku küsimine võiks tabada suvalist gunicorn'i workerit.
+GPT_TIMEOUT = float(os.getenv("GPT_TIMEOUT", "60"))
+gpt_jobs = JobQueue(
+    os.getenv("GPT_JOBS_PATH", os.path.join(_DATA_DIR, "gpt_jobs.sqlite")),
+    workers=int(os.getenv("GPT_WORKERS", "2")),
+    max_queue=int(os.getenv("GPT_QUEUE_MAX", "20")),
+    timeout=GPT_TIMEOUT,
+    name="gpt",
+)
 
-def set_openai_client(client: OpenAI) -> None:
+# Korduvad küsimused vastatakse püsivast vahemälust (võti: normaliseeritud küsimus, mudel, keel)
+GPT_MODEL = os.getenv("GPT_MODEL", "gpt-4.1-mini")
+gpt_cache = ResponseCache(
+    os.getenv("GPT_CACHE_PATH", os.path.join(_DATA_DIR, "gpt_cache.sqlite")),
+    ttl=int(os.getenv("GPT_CACHE_TTL", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("GPT_CACHE_MAX_ENTRIES", "5000")),
+)
+
+# Tabelite metaandmete vahemälu, võti (tabel, keel). Metaandmed muutuvad harva,
+# seega piisab ühest päringust värskendusakna (STAT_META_TTL sekundit) kohta.
+META_TTL = int(os.getenv("STAT_META_TTL", "3600"))
+_meta_cache = TTLCache(maxsize=32, ttl=META_TTL)
+_meta_versions = {}
+
+def set_openai_client(client: "OpenAI") -> None:
     global _client
     _client = client
 
-def get_openai_client():
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY puudub — kontrolli .env ja load_dotenv teed")
-    return OpenAI(api_key=api_key)
+def get_openai_client() -> "OpenAI":
+    """Tagastab protsessi OpenAI kliendi, luues selle esimesel kasutusel."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise RuntimeError("OPENAI_API_KEY puudub — kontrolli .env ja load_dotenv teed")
+                from openai import OpenAI
+                _client = OpenAI(api_key=api_key)
+    return _client
+
+def cached_gpt_answer(user_text: str, lang: str = "et") -> Optional[str]:
+    """Vahemälus olev vastus samale (normaliseeritud) küsimusele või None."""
+    return gpt_cache.get(prompt_key(user_text, GPT_MODEL, lang))
 
-def ask_gpt(user_text: str) -> str:
+
+def ask_gpt(user_text: str, lang: str = "et", use_cache: bool = True) -> str:
     """
     Küsib GPT-lt vastuse antud tekstile ja tagastab stringi. 
     Kui API kutse ebaõnnestub, tagastab viisaka veateate.
+    use_cache=False jätab vahemälu lugemise vahele (kutsuja on seda juba teinud); vastus salvestatakse ikka.
     """
-    if _client is None:
-        raise RuntimeError("OpenAI client pole määratud. Kutsu set_openai_client(app_client) enne ask_gpt.")
+    if use_cache:
+        cached = cached_gpt_answer(user_text, lang)
+        if cached is not None:
+            return cached
+    client = get_openai_client()
     try:
-        response = _client.responses.create(
-            model="gpt-4.1-mini",
-            input=user_text
+        response = client.responses.create(
+            model=GPT_MODEL,
+            input=user_text,
+            timeout=GPT_TIMEOUT
         )
-        return response.output[0].content[0].text
+        answer = response.output[0].content[0].text
+        gpt_cache.set(prompt_key(user_text, GPT_MODEL, lang), answer)
+        return answer
     except Exception as e: # logime vea serveri poolel, et arendaja näeks
         _log.error("GPT API error: %s", exc_info=e)
         return "Vabandust, praegu ei õnnestu GPT-lt vastust saada. Proovi hiljem uuesti."
@@ -54,14 +110,64 @@ def apply_common_legend(fig, orientation, y, x, yanchor="bottom", xanchor="cente
 
 # Abifunktsioon metaandmete jaoks
 
+def get_table_meta(table="PA103", lang="et"):
+    """
+    Tagastab tabeli metaandmed (muutujad, väärtused, tekstid) vahemälust.
+    Kui kirje puudub või on aegunud, tehakse uus GET päring.
+    """
+    meta = cached_table_meta(table, lang)
+    if meta is None:
+        meta = get_json(table, lang)
+        store_table_meta(table, lang, meta)
+    return meta
+
+
+def cached_table_meta(table="PA103", lang="et"):
+    """Metaandmed vahemälust ilma päringuta (None, kui puudub või aegunud)."""
+    return _meta_cache.get((table, lang))
+
+
+def store_table_meta(table, lang, meta):
+    """Salvestab metaandmed vahemällu (kasutavad nii sünkroonne kui asünkroonne päring)."""
+    key = (table, lang)
+    _meta_cache.set(key, meta)
+
+    # Jälgi tabeli versiooni ("updated"), et sõltuvad vahemälud teaksid andmete muutumisest
+    version = meta.get("updated")
+    previous = _meta_versions.get(key)
+    if previous is not None and previous != version:
+        _log.info("Tabel %s (%s) on uuenenud: %s -> %s", table, lang, previous, version)
+    _meta_versions[key] = version
+
+
+def get_table_version(table="PA103", lang="et"):
+    """Tabeli viimase uuenduse tempel metaandmetest (None, kui API seda ei anna)."""
+    return get_table_meta(table, lang).get("updated")
+
+
+def invalidate_meta(table=None, lang=None):
+    """Tühjendab metaandmete vahemälu (kõik või ühe tabeli/keele kirje)."""
+    if table is None:
+        _meta_cache.invalidate()
+    else:
+        for code in ([lang] if lang else ["et", "en"]):
+            _meta_cache.invalidate((table, code))
+
+
+def meta_cache_stats():
+    return _meta_cache.stats()
+
+
 def get_meta_options(table="PA103", lang="et"):
-    url = f"https://andmed.stat.ee/api/v1/{lang}/stat/{table}"
-    meta = requests.get(url).json()
+    return meta_options(get_table_meta(table, lang))
+
 
+def meta_options(meta):
+    """Teisendab metaandmed dropdown'i valikuteks: {muutuja kood: [{"label", "value"}, ...]}."""
     opts = {}
     for v in meta["variables"]:
         code = v["code"]
         values = v["values"]
         labels = v["valueTexts"]
         opts[code] = [{"label": lbl, "value": val} for val, lbl in zip(values, labels)]
-    return opts
\ No newline at end of file
+    return opts
@@ -0,0 +1,179 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class QueueFull(Exception):
+    """Järjekorras on juba maksimaalne arv töid."""
+
+
+class JobQueue:
+    """
+    Piiratud lõimekogumiga taustatööde järjekord (nt GPT päringud), et aeglased tööd
+    ei hoiaks kinni Dash'i workereid.
+
+    Tööd jooksevad selle protsessi lõimekogumis, mis need vastu võttis, kuid nende olek ja
+    tulemus hoitakse SQLite tabelis (`path`). Nii saab oleku küsimine, tühistamine ja järjekorra
+    pikkuse kontroll tabada suvalist gunicorn'i workerit.
+
+    :param path: jagatud SQLite faili asukoht
+    :param workers: samaaegselt töötavate tööde arv protsessi kohta
+    :param max_queue: maksimaalne ootel + töös olevate tööde arv kõigi workerite peale kokku
+    :param timeout: töö ajalõpp sekundites; hiljem valmiv tulemus jäetakse kõrvale
+    """
+
+    def __init__(self, path, workers=2, max_queue=20, timeout=60, name="jobs"):
+        self.path = Path(path)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.name = name
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._conn = None
+        self._pid = None
+
+    def _ensure_process(self):
+        # Lõimekogum ja SQLite ühendus luuakse laisalt ja pärast fork'i uuesti
+        pid = os.getpid()
+        if self._pid != pid:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, queue TEXT NOT NULL, state TEXT NOT NULL,"
+                " result TEXT, submitted REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            self._futures = {}
+            self._pid = pid
+
+    def _db(self):
+        self._ensure_process()
+        return self._conn
+
+    def _executor(self):
+        self._ensure_process()
+        return self._pool
+
+    def _set_state(self, job_id, state, result=None, only_from=("queued", "running")):
+        # Lõppolekut ei kirjutata üle: tühistatud või aegunud töö hilisem tulemus jäetakse kõrvale
+        with self._lock:
+            db = self._db()
+            marks = ",".join("?" * len(only_from))
+            cur = db.execute(
+                f"UPDATE jobs SET state = ?, result = ? WHERE id = ? AND state IN ({marks})",
+                (state, result, job_id, *only_from),
+            )
+            db.commit()
+            return cur.rowcount > 0
+
+    def _run(self, job_id, fn, args, kwargs):
+        if not self._set_state(job_id, "running", only_from=("queued",)):
+            return  # tühistati ootamise ajal (võimalik, et teises workeris)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._set_state(job_id, "error", json.dumps(repr(e)))
+        else:
+            self._set_state(job_id, "done", json.dumps(result))
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def submit(self, fn, *args, **kwargs):
+        """Lisab töö järjekorda ja tagastab töö id. Täis järjekorra korral QueueFull."""
+        with self._lock:
+            db = self._db()
+            self._prune(db)
+            # BEGIN IMMEDIATE lukustab faili kirjutamiseks, et kaks workerit ei ületaks piiri korraga
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._pending(db) >= self.max_queue:
+                    raise QueueFull(f"{self.name}: järjekorras on {self.max_queue} tööd")
+                job_id = uuid.uuid4().hex
+                db.execute(
+                    "INSERT INTO jobs (id, queue, state, submitted) VALUES (?, ?, 'queued', ?)",
+                    (job_id, self.name, time.time()),
+                )
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+            self._futures[job_id] = self._executor().submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _pending(self, db):
+        # Krahhinud workeri tööd ei loe järjekorda pärast ajalõppu
+        return db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE queue = ? AND state IN ('queued', 'running') AND submitted > ?",
+            (self.name, time.time() - self.timeout),
+        ).fetchone()[0]
+
+    def pending(self):
+        with self._lock:
+            return self._pending(self._db())
+
+    def status(self, job_id):
+        """
+        Töö olek: {"state": "queued" | "running" | "done" | "error" | "timeout" | "cancelled" | "unknown", ...}.
+        Lõppenud töö eemaldatakse pärast oleku lugemist.
+        """
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT state, result, submitted FROM jobs WHERE id = ? AND queue = ?", (job_id, self.name)
+            ).fetchone()
+            if row is None:
+                return {"state": "unknown"}
+            state, result, submitted = row
+
+            if state in ("queued", "running"):
+                if time.time() - submitted <= self.timeout:
+                    return {"state": state}
+                future = self._futures.pop(job_id, None)
+                if future is not None:
+                    future.cancel()
+                status = {"state": "timeout"}
+            elif state == "done":
+                status = {"state": "done", "result": json.loads(result)}
+            elif state == "error":
+                status = {"state": "error", "error": json.loads(result)}
+            else:
+                status = {"state": state}
+
+            db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            db.commit()
+            return status
+
+    def cancel(self, job_id):
+        """Tühistab ootel töö; juba töötava töö tulemus jäetakse kõrvale."""
+        if not self._set_state(job_id, "cancelled"):
+            return False
+        with self._lock:
+            future = self._futures.pop(job_id, None)
+        if future is not None:
+            future.cancel()
+        return True
+
+    def _prune(self, db):
+        # Eemalda tööd, mille olekut keegi enam ei küsi (nt suletud brauseriaken)
+        db.execute(
+            "DELETE FROM jobs WHERE queue = ? AND submitted < ?",
+            (self.name, time.time() - 10 * self.timeout),
+        )
+        db.commit()
+
+    def stats(self):
+        with self._lock:
+            db = self._db()
+            tracked = db.execute("SELECT COUNT(*) FROM jobs WHERE queue = ?", (self.name,)).fetchone()[0]
+            return {"pending": self._pending(db), "tracked": tracked, "max_queue": self.max_queue}
@@ -0,0 +1,152 @@
+"""
+Väike Prometheus-tekstivormingus mõõdikute register (ilma välise sõltuvuseta).
+
+Mõõdikud on protsessi (gunicorn workeri) põhised, nagu ka vahemälud, mille tabamusi need kajastavad.
+"""
+import functools
+import threading
+import time
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + inner + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(f"{self.name}_bucket{_labels(key + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{self.name}_sum{_labels(key)} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{_labels(key)} {series['count']}")
+        return lines
+
+
+callback_latency = Histogram("dash_callback_duration_seconds", "Dash callback'i kestus")
+callback_errors = Counter("dash_callback_errors_total", "Dash callback'i erindid")
+upstream_requests = Counter("stat_api_requests_total", "andmed.stat.ee päringud tabeli, meetodi ja staatuse kaupa")
+upstream_latency = Histogram("stat_api_request_duration_seconds", "andmed.stat.ee päringu kestus")
+upstream_bytes = Counter("stat_api_response_bytes_total", "andmed.stat.ee vastuste maht baitides")
+upstream_errors = Counter("stat_api_errors_total", "andmed.stat.ee päringu vead (võrk või HTTP >= 400)")
+
+_stat_sources = {}
+
+
+def observe_upstream(table, method, status, seconds, nbytes):
+    upstream_requests.inc(table=table, method=method, status=status)
+    upstream_latency.observe(seconds, table=table, method=method)
+    upstream_bytes.inc(nbytes, table=table, method=method)
+    if status == "error" or (isinstance(status, int) and status >= 400):
+        upstream_errors.inc(table=table, method=method)
+
+
+def register_cache(name, stats_fn):
+    """Registreerib vahemälu, mille `stats_fn()` tagastab vähemalt "hits" ja "misses" (ja soovi korral "size")."""
+    _stat_sources[name] = stats_fn
+
+
+def _cache_lines():
+    lines = [
+        "# HELP app_cache_hits_total Vahemälu tabamused",
+        "# TYPE app_cache_hits_total counter",
+    ]
+    misses, ratios, sizes = [], [], []
+    for name, stats_fn in sorted(_stat_sources.items()):
+        stats = stats_fn()
+        hits, miss = stats.get("hits", 0), stats.get("misses", 0)
+        label = _labels((("cache", name),))
+        lines.append(f"app_cache_hits_total{label} {hits}")
+        misses.append(f"app_cache_misses_total{label} {miss}")
+        ratios.append(f"app_cache_hit_ratio{label} {hits / (hits + miss) if hits + miss else 0:.4f}")
+        if "size" in stats:
+            sizes.append(f"app_cache_entries{label} {stats['size']}")
+    return (lines
+            + ["# HELP app_cache_misses_total Vahemälu möödalasked", "# TYPE app_cache_misses_total counter"] + misses
+            + ["# HELP app_cache_hit_ratio Tabamuste osakaal", "# TYPE app_cache_hit_ratio gauge"] + ratios
+            + ["# HELP app_cache_entries Kirjete arv", "# TYPE app_cache_entries gauge"] + sizes)
+
+
+def render():
+    lines = []
+    for metric in (callback_latency, callback_errors, upstream_requests, upstream_latency,
+                   upstream_bytes, upstream_errors):
+        lines.extend(metric.render())
+    lines.extend(_cache_lines())
+    return "\n".join(lines) + "\n"
+
+
+def instrument_callbacks(app):
+    """Mähib kõik registreeritud serveripoolsed callback'id kestuse ja vigade mõõtmisega."""
+    for entry in app.callback_map.values():
+        func = entry.get("callback")
+        if func is None or getattr(func, "_metrics_wrapped", False):
+            continue
+        entry["callback"] = _timed(func)
+
+
+def _timed(func):
+    from dash.exceptions import PreventUpdate
+
+    name = getattr(func, "__name__", "callback")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except PreventUpdate:
+            raise
+        except Exception:
+            callback_errors.inc(callback=name)
+            raise
+        finally:
+            callback_latency.observe(time.perf_counter() - started, callback=name)
+
+    wrapper._metrics_wrapped = True
+    return wrapper
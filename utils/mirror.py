@@ -0,0 +1,126 @@
+"""
+Statistikaameti tabelite kohalik peegel.
+
+Sünkroniseerimine laadib terve tabeli (kõik dimensioonide väärtused) alla ja salvestab
+selle Parquet-failina koos tabeli versiooniga (metaandmete "updated") kõrvalfailis.
+Filtreeritud päringud loetakse seejärel kettalt pyarrow predikaatide abil, ilma API
+päringuta, kuni peegli versioon ühtib tabeli praeguse versiooniga.
+
+Käivitamine:
+    python -m utils.mirror                      # PA103 ja PA117 (andmekeel STAT_DATA_LANG)
+    python -m utils.mirror PA117 --lang en
+"""
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.decode import concat_frames, decode_jsonstat2
+from utils.fetch_data import fetch_data, plan_chunks
+from utils.helpers import get_table_meta
+
+
+_log = logging.getLogger(__name__)
+
+MIRROR_DIR = Path(os.getenv("STAT_MIRROR_DIR", Path(__file__).resolve().parent.parent / "data" / "mirror"))
+
+# Vaikimisi peegeldatavad tabelid; veerunimed tulevad tabelite kirjeldusest (utils.tables)
+MIRROR_TABLES = ["PA103", "PA117"]
+# Peeglis on ainult koodid ja väärtused, mis on keelest sõltumatud; nimetused tulevad
+# metaandmetest (vt utils.cube), seega piisab ühest keeleversioonist
+MIRROR_LANGS = [os.getenv("STAT_DATA_LANG", "et")]
+
+
+def mirror_path(table: str, lang: str = "et") -> Path:
+    return MIRROR_DIR / f"{table}_{lang}.parquet"
+
+
+def mirror_version_path(table: str, lang: str = "et") -> Path:
+    return MIRROR_DIR / f"{table}_{lang}.json"
+
+
+def mirror_version(table: str, lang: str = "et"):
+    """Peegli allika versioon sünkroniseerimise ajal; None, kui kõrvalfail puudub või on vigane."""
+    try:
+        with open(mirror_version_path(table, lang), encoding="utf-8") as f:
+            return json.load(f)["updated"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def sync_table(table: str, lang: str = "et") -> Path:
+    """Laadib terve tabeli alla ja kirjutab selle atomaarselt Parquet-faili."""
+    # utils.tables -> utils.cube -> utils.mirror, seega imporditakse siin
+    from utils.tables import table_columns
+
+    meta = get_table_meta(table, lang)
+    # Versioon võetakse enne andmeid: kui tabel muutub sünkroniseerimise ajal, jääb peegel
+    # vanema versiooniga ja seda ei kasutata enne järgmist sünkroniseerimist
+    version = meta.get("updated")
+    query = [
+        {"code": v["code"], "selection": {"filter": "all", "values": ["*"]}}
+        for v in meta["variables"]
+    ]
+    # Terve tabel võib ületada API lahtrite piiri, seega laetakse see osade kaupa
+    columns = table_columns(table, meta)
+    frames = [
+        decode_jsonstat2(fetch_data(table, chunk, lang, "json-stat2"), columns)
+        for chunk in plan_chunks(query, meta)
+    ]
+    df = concat_frames(frames, columns)
+
+    path = mirror_path(table, lang)
+    version_path = mirror_version_path(table, lang)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Kõrvalfail eemaldatakse enne andmefaili vahetamist, et katkestuse korral ei jääks
+    # uue faili kõrvale vana versioon (ilma versioonita peeglit ei kasutata)
+    version_path.unlink(missing_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    tmp = version_path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated": version, "rows": len(df)}, f, ensure_ascii=False)
+    os.replace(tmp, version_path)
+
+    _log.info("Peegel %s (%s): %d rida, versioon %s", table, lang, len(df), version)
+    return path
+
+
+def query_mirror(table: str, lang: str, filters: dict, version=None):
+    """
+    Filtreeritud päring kohalikust peeglist.
+
+    :param filters: {veerg: väärtuste list}; tühjad/None filtrid jäetakse vahele
+    :param version: tabeli praegune versioon (metaandmete "updated"); kui antud, kasutatakse
+        peeglit ainult sama versiooni korral
+    :return: DataFrame või None, kui peeglit pole või see on aegunud (kutsuja läheb siis API kaudu)
+    """
+    path = mirror_path(table, lang)
+    if not path.exists():
+        return None
+    if version is not None and mirror_version(table, lang) != version:
+        _log.info("Peegel %s (%s) on aegunud (tabeli versioon %s), kasutan API-t", table, lang, version)
+        return None
+
+    predicates = [(col, "in", list(values)) for col, values in filters.items() if values]
+    return pd.read_parquet(path, filters=predicates or None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sünkroniseeri Statistikaameti tabelid kohalikku peeglisse")
+    parser.add_argument("tables", nargs="*", default=MIRROR_TABLES)
+    parser.add_argument("--lang", nargs="+", default=MIRROR_LANGS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    for table in args.tables:
+        for lang in args.lang:
+            print("Sünkroniseerin", table, lang, "->", sync_table(table, lang))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Soovi korral sisselülitatav callback'ide profileerimine.
+
+    DASH_PROFILE=1              profileeri kõiki callback'e
+    DASH_PROFILE_TOKEN=<salajane> profileeri ainult päringuid, millel on päis "X-Profile: <salajane>"
+                                (callback'ide POST /_dash-update-component ei sisalda lehe
+                                päringuparameetreid, seega ainult päisena)
+
+Iga väljakutse kohta kirjutatakse STAT_PROFILE_DIR kausta (vaikimisi <repo>/data/profiles):
+    <aeg>_<callback>_<pid>.prof     cProfile väljund (snakeviz, pstats)
+    <aeg>_<callback>_<pid>.folded   valimitega kogutud pinud flamegraph.pl / speedscope jaoks
+
+Kui kumbki muutuja pole seatud, ei paigaldata ühtegi mähist ja lisakulu puudub.
+"""
+import cProfile
+import functools
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+
+PROFILE_ALL = os.getenv("DASH_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_TOKEN = os.getenv("DASH_PROFILE_TOKEN", "")
+PROFILE_DIR = Path(os.getenv("STAT_PROFILE_DIR", Path(__file__).resolve().parent.parent / "data" / "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("STAT_PROFILE_INTERVAL", "0.005"))
+
+# cProfile'i saab korraga kasutada ainult üks profileerija; samaaegsed väljakutsed saavad vaid valimid
+_cprofile_lock = threading.Lock()
+
+
+def enabled():
+    return PROFILE_ALL or bool(PROFILE_TOKEN)
+
+
+def _requested():
+    if PROFILE_ALL:
+        return True
+    from flask import has_request_context, request
+    if not has_request_context():
+        return False
+    given = request.headers.get("X-Profile", "")
+    # Baitidena, sest compare_digest tõstab mitte-ASCII str korral TypeError'i
+    return hmac.compare_digest(given.encode("utf-8"), PROFILE_TOKEN.encode("utf-8"))
+
+
+class _Sampler(threading.Thread):
+    """Kogub etteantud lõime pinu iga SAMPLE_INTERVAL sekundi järel (folded-stack kujul)."""
+
+    def __init__(self, thread_id):
+        super().__init__(daemon=True, name="profile-sampler")
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _write(name, profile, sampler):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() // 1_000_000 % 1000:03d}"
+    stem = PROFILE_DIR / f"{stamp}_{name}_{os.getpid()}"
+    if profile is not None:
+        profile.dump_stats(f"{stem}.prof")
+    with open(f"{stem}.folded", "w", encoding="utf-8") as f:
+        for stack, count in sampler.samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _profiled(func):
+    name = getattr(func, "__name__", "callback")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _requested():
+            return func(*args, **kwargs)
+
+        sampler = _Sampler(threading.get_ident())
+        profile = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+        sampler.start()
+        try:
+            if profile is None:
+                return func(*args, **kwargs)
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            sampler.stop()
+            if profile is not None:
+                _cprofile_lock.release()
+            _write(name, profile, sampler)
+
+    return wrapper
+
+
+def instrument_callbacks(app):
+    """Mähib serveripoolsed callback'id profileerijaga, kui profileerimine on sisse lülitatud."""
+    if not enabled():
+        return
+    for entry in app.callback_map.values():
+        func = entry.get("callback")
+        if func is not None:
+            entry["callback"] = _profiled(func)
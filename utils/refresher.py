@@ -0,0 +1,116 @@
+import logging
+import os
+import threading
+import time
+
+from utils.workers import threads_allowed
+
+
+_log = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = int(os.getenv("STAT_REFRESH_INTERVAL", "3600"))
+
+
+class DatasetRefresher:
+    """
+    Stale-while-revalidate andmekogumite hoidja.
+
+    `get()` tagastab alati viimase õnnestunud tulemuse kohe; taustalõim laeb
+    registreeritud andmekogumid iga `interval` sekundi järel uuesti. Ebaõnnestunud
+    värskendus jätab vana tulemuse alles ja suurendab vigade loendurit.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL):
+        self.interval = interval
+        self._loaders = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._thread = None
+        self._thread_pid = None
+
+    def get(self, name, loader):
+        """Tagastab andmekogumi `name`; esimesel korral laetakse see sünkroonselt `loader()` abil."""
+        self._ensure_thread()
+        with self._lock:
+            self._loaders.setdefault(name, loader)
+            entry = self._entries.get(name)
+        if entry is not None and "data" in entry:
+            return entry["data"]
+
+        # Esimene laadimine: ainult üks lõim laeb, teised ootavad sama lukuga
+        with self._load_lock(name):
+            entry = self._entries.get(name)
+            if entry is not None and "data" in entry:
+                return entry["data"]
+            self.refresh(name, raise_errors=True)
+            return self._entries[name]["data"]
+
+    def refresh(self, name, raise_errors=False):
+        loader = self._loaders[name]
+        started = time.time()
+        try:
+            data = loader()
+        except Exception as e:
+            with self._lock:
+                entry = self._entries.setdefault(name, {"failures": 0})
+                entry["failures"] += 1
+                entry["last_error"] = repr(e)
+                entry["last_attempt"] = started
+            _log.warning("Andmekogumi %s värskendamine ebaõnnestus: %s", name, e)
+            if raise_errors:
+                raise
+            return False
+
+        with self._lock:
+            entry = self._entries.setdefault(name, {"failures": 0})
+            entry["data"] = data
+            entry["loaded_at"] = time.time()
+            entry["last_attempt"] = started
+        return True
+
+    def refresh_all(self):
+        with self._lock:
+            names = list(self._loaders)
+        for name in names:
+            self.refresh(name)
+
+    def status(self):
+        """Iga andmekogumi vanus sekundites, vigade arv ja viimane viga."""
+        now = time.time()
+        with self._lock:
+            return {
+                str(name): {
+                    "age": round(now - entry["loaded_at"], 1) if "loaded_at" in entry else None,
+                    "failures": entry.get("failures", 0),
+                    "last_error": entry.get("last_error"),
+                }
+                for name, entry in self._entries.items()
+            }
+
+    def _load_lock(self, name):
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    def _ensure_thread(self):
+        # Lõimed ei ela fork'i üle, seega käivitame lõime igas workeri protsessis eraldi.
+        # Soojendusel masteris (workers.inline) lõime ei looda, workeris käivitub see esimese get'iga.
+        if not threads_allowed():
+            return
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None:
+            return
+        with self._lock:
+            if self._thread_pid == pid and self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.refresh_all()
+
+
+refresher = DatasetRefresher()
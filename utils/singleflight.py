@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        # Asünkroonsed ootajad: (sündmustsükkel, future), äratatakse ilma lõime blokeerimata
+        self.waiters = []
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    """
+    Ühendab samaaegsed identsed päringud: esimene kutsuja teeb töö ära,
+    teised sama võtmega kutsujad ootavad ja saavad sama tulemuse (või vea).
+    Sünkroonsed (do) ja asünkroonsed (do_async) kutsujad jagavad samu käimasolevaid päringuid.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key, waiter=None):
+        """(kõne, kas juht); ootaja registreeritakse lukuga, et lõpetamise äratus ei läheks kaotsi."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                return call, True
+            self.coalesced += 1
+            if waiter is not None:
+                call.waiters.append(waiter)
+            return call, False
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+        call.event.set()
+        for loop, future in call.waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    @staticmethod
+    def _outcome(call):
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn):
+        call, leader = self._join(key)
+        if not leader:
+            call.event.wait()
+            return self._outcome(call)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    async def do_async(self, key, fn):
+        """Nagu do, kuid `fn()` tagastab korutiini ja ootamine ei blokeeri sündmustsüklit."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        call, leader = self._join(key, (loop, future))
+        if not leader:
+            await future
+            return self._outcome(call)
+
+        try:
+            call.result = await fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
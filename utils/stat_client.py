@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import metrics
+from utils.cache import TTLCache
+from utils.singleflight import SingleFlight
+
+
+STAT_API_BASE = "https://andmed.stat.ee/api/v1"
+
+# Ühenduste kogumi suurus ja päringu ajalõpp, seadistatav keskkonnamuutujatega
+POOL_SIZE = int(os.getenv("STAT_API_POOL_SIZE", "10"))
+TIMEOUT = float(os.getenv("STAT_API_TIMEOUT", "30"))
+
+# Vaikimisi vastuse formaat andmepäringutele: "json" (read) või "json-stat2" (tihe massiiv)
+DEFAULT_FORMAT = os.getenv("STAT_API_FORMAT", "json")
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+_requests_sent = 0
+
+# Samaaegsed identsed päringud (tabel, normaliseeritud päring, keel) tehakse ainult üks kord
+_flight = SingleFlight()
+
+# HTTP validaatorid (ETag / Last-Modified) koos viimase vastusega päringu võtme kaupa;
+# 304 Not Modified korral tagastatakse salvestatud vastus ilma keha uuesti alla laadimata.
+# Kehade kogumaht on piiratud (STAT_VALIDATOR_MAX_BYTES) ja suuremat kui STAT_VALIDATOR_MAX_BODY
+# vastust ei jäeta meelde – suured andmekuubid hoiab niikuinii utils.cube vahemälu.
+VALIDATOR_MAX_BODY = int(os.getenv("STAT_VALIDATOR_MAX_BODY", str(2 * 1024 * 1024)))
+_validators = TTLCache(maxsize=int(os.getenv("STAT_VALIDATOR_CACHE_SIZE", "256")),
+                       max_weight=int(os.getenv("STAT_VALIDATOR_MAX_BYTES", str(32 * 1024 * 1024))))
+_not_modified = 0
+
+
+def table_url(table: str, lang: str = "et") -> str:
+    return f"{STAT_API_BASE}/{lang}/stat/{table}"
+
+
+def get_session() -> requests.Session:
+    """
+    Tagastab protsessi (workeri) ühise keep-alive sessiooni.
+    Pärast fork'i luuakse uus sessioon, et lapsprotsessid ei jagaks pesasid.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+                _session_pid = pid
+    return _session
+
+
+def _count_request():
+    global _requests_sent
+    with _lock:
+        _requests_sent += 1
+
+
+def _normalize_payload(payload: dict) -> str:
+    """Päringu võti: filtrite järjekord ei muuda tulemust, seega sorteerime koodi järgi."""
+    query = sorted(payload.get("query", []), key=lambda q: q.get("code", ""))
+    return json.dumps({**payload, "query": query}, sort_keys=True, ensure_ascii=False)
+
+
+def _conditional_headers(entry):
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _handle(key, res, entry):
+    """
+    Tagastab vastuse JSON-i; 304 korral päringuga saadetud validaatorite kirje keha.
+    Validaatoritega vastused jäetakse meelde, kui need pole liiga suured.
+    """
+    global _not_modified
+    if res.status_code == 304:
+        if entry is None:
+            raise requests.HTTPError(f"304 Not Modified ilma salvestatud vastuseta: {res.url}", response=res)
+        with _lock:
+            _not_modified += 1
+        return entry["body"]
+    res.raise_for_status()
+    body = res.json()
+
+    etag = res.headers.get("ETag")
+    last_modified = res.headers.get("Last-Modified")
+    if (etag or last_modified) and len(res.content) <= VALIDATOR_MAX_BODY:
+        _validators.set(key, {"etag": etag, "last_modified": last_modified, "body": body},
+                        weight=len(res.content))
+    return body
+
+
+def _request(method, table, lang, headers, **kwargs):
+    """Saadab päringu ja registreerib kestuse, staatuse ja vastuse mahu tabeli kaupa."""
+    _count_request()
+    started = time.perf_counter()
+    try:
+        res = get_session().request(method, table_url(table, lang), headers=headers, timeout=TIMEOUT, **kwargs)
+    except requests.RequestException:
+        metrics.observe_upstream(table, method, "error", time.perf_counter() - started, 0)
+        raise
+    metrics.observe_upstream(table, method, res.status_code, time.perf_counter() - started, len(res.content))
+    return res
+
+
+def _send(method, key, table, lang, **kwargs):
+    # Kirje võetakse üks kord: 304 vastus rahuldatakse sama kirjega, millest päised tehti
+    entry = _validators.get(key)
+    res = _request(method, table, lang, _conditional_headers(entry), **kwargs)
+    if res.status_code == 304 and entry is None:
+        # 304 ilma tingimuslike päisteta (nt vahendaja vahemälu): küsi kogu vastus uuesti
+        res = _request(method, table, lang, {"Cache-Control": "no-cache"}, **kwargs)
+    return _handle(key, res, entry)
+
+
+async def _request_async(client, method, table, lang, headers, **kwargs):
+    """_request asünkroonsele kliendile (utils.async_client): sama loendur ja /metrics andmed."""
+    _count_request()
+    started = time.perf_counter()
+    try:
+        res = await client.request(method, table_url(table, lang), headers=headers, **kwargs)
+    except Exception:
+        metrics.observe_upstream(table, method, "error", time.perf_counter() - started, 0)
+        raise
+    metrics.observe_upstream(table, method, res.status_code, time.perf_counter() - started, len(res.content))
+    return res
+
+
+async def _send_async(client, method, key, table, lang, **kwargs):
+    # Samad validaatorid ja 304 käsitlus nagu _send'is; httpx vastusel on sama liides
+    entry = _validators.get(key)
+    res = await _request_async(client, method, table, lang, _conditional_headers(entry), **kwargs)
+    if res.status_code == 304 and entry is None:
+        res = await _request_async(client, method, table, lang, {"Cache-Control": "no-cache"}, **kwargs)
+    return _handle(key, res, entry)
+
+
+def _get(key, table, lang):
+    return _send("GET", key, table, lang)
+
+
+def _post(key, table, payload, lang):
+    return _send("POST", key, table, lang, json=payload)
+
+
+def get_json(table: str, lang: str = "et") -> dict:
+    """GET päring tabeli aadressile (metaandmed), tagastab JSON-i."""
+    key = ("GET", table, lang)
+    return _flight.do(key, lambda: _get(key, table, lang))
+
+
+def post_json(table: str, payload: dict, lang: str = "et") -> dict:
+    """POST andmepäring tabelile, tagastab JSON-i."""
+    key = ("POST", table, lang, _normalize_payload(payload))
+    return _flight.do(key, lambda: _post(key, table, payload, lang))
+
+
+async def get_json_async(client, table: str, lang: str = "et") -> dict:
+    """get_json asünkroonse kliendiga; ühendatakse ka samaaegsete sünkroonsete päringutega."""
+    key = ("GET", table, lang)
+    return await _flight.do_async(key, lambda: _send_async(client, "GET", key, table, lang))
+
+
+async def post_json_async(client, table: str, payload: dict, lang: str = "et") -> dict:
+    """post_json asünkroonse kliendiga; ühendatakse ka samaaegsete sünkroonsete päringutega."""
+    key = ("POST", table, lang, _normalize_payload(payload))
+    return await _flight.do_async(key, lambda: _send_async(client, "POST", key, table, lang, json=payload))
+
+
+def connection_stats() -> dict:
+    """
+    Ühenduste taaskasutuse statistika: saadetud päringud vs. avatud TCP/TLS ühendused.
+    """
+    opened = 0
+    session = _session
+    if session is not None and _session_pid == os.getpid():
+        pools = session.get_adapter(STAT_API_BASE).poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            if pool is not None:
+                opened += pool.num_connections
+    return {
+        "requests": _requests_sent,
+        "connections": opened,
+        "reused": max(_requests_sent - opened, 0),
+        "pool_size": POOL_SIZE,
+    }
+
+
+def coalescing_stats() -> dict:
+    """Mitu päringut tehti tegelikult ja mitu kutsujat ühendati käimasoleva päringuga."""
+    return _flight.stats()
+
+
+def revalidation_stats() -> dict:
+    """Mitu päringut vastati 304 Not Modified abil, mitme päringu validaatorid on meeles ja nende maht baitides."""
+    stats = _validators.stats()
+    return {"not_modified": _not_modified, "validators": stats["size"], "bytes": stats["weight"]}
@@ -0,0 +1,200 @@
+"""
+Metaandmetel põhinev tabelite laadija: üks mootor kõigi stat.ee tabelite jaoks.
+
+Tabel kirjeldatakse dimensioonide rollide kaudu (näitaja, tegevusala, periood, ...). Rollid
+seotakse API muutujate koodidega vahemälus olevate metaandmete põhjal, nii et päringu
+koostamine, vahemälu (utils.cube), kohalik peegel ja kiire dekodeerimine on igale tabelile samad:
+
+    fetch_table("PA103", {"indicator": "GR_W_AVG", "sector": "TOTAL"}, lang="en")
+
+Kirjeldamata tabeli dimensioonide rollid ja veerud on muutujate koodid väiketähtedega
+(nt {"vaatlusperiood": "2023"}).
+"""
+import pandas as pd
+
+from utils.async_client import get_table_meta_async
+from utils.cube import DATA_LANG, get_cube, get_cube_async
+from utils.decode import decode_jsonstat2, decode_rows
+from utils.helpers import get_table_meta
+
+
+class Dimension:
+    """
+    Tabeli dimensioon.
+
+    :param role: nimi, millega filtreid antakse (nt "indicator")
+    :param column: veeru nimi tulemuses (nt "näitaja")
+    :param codes: API muutuja koodid või nimetused, millega roll metaandmetes ära tuntakse
+    :param time: kui koodi järgi ei leita, vali ajadimensioon (metaandmetes "time": true)
+    :param label: kui antud, lisatakse selle nimega veerg koodide keelespetsiifiliste nimetustega
+    """
+
+    def __init__(self, role, column, codes=(), time=False, label=None):
+        self.role = role
+        self.column = column
+        self.codes = {c.casefold() for c in (*codes, column)}
+        self.time = time
+        self.label = label
+
+    def matches(self, variable):
+        return (variable["code"].casefold() in self.codes
+                or variable.get("text", "").casefold() in self.codes)
+
+
+class TableSpec:
+    def __init__(self, table, dimensions):
+        self.table = table
+        self.dimensions = dimensions
+
+
+TABLES = {
+    "PA103": TableSpec("PA103", [
+        Dimension("indicator", "näitaja", ("Näitaja", "Indicator"), label="näitaja_nimi"),
+        Dimension("sector", "tegevusala", ("Tegevusala", "Economic activity")),
+        Dimension("period", "aasta", ("Vaatlusperiood", "Aasta", "Reference period", "Year"), time=True),
+    ]),
+    "PA117": TableSpec("PA117", [
+        Dimension("indicator", "näitaja", ("Näitaja", "Indicator"), label="näitaja_nimi"),
+        Dimension("region", "maakond", ("Maakond", "County"), label="maakond_nimi"),
+        Dimension("period", "vaatlusperiood", ("Vaatlusperiood", "Reference period"), time=True),
+    ]),
+}
+
+
+def table_spec(table):
+    return TABLES.get(table) or TableSpec(table, [])
+
+
+def resolve_dimensions(table, meta):
+    """
+    Seob metaandmete muutujad dimensioonidega.
+
+    :return: dimensioonid metaandmete (= API vastuse) järjekorras; kirjeldamata muutujatele
+        luuakse dimensioon, mille roll ja veerg on koodi väiketähtedega kuju
+    :raises ValueError: kui mõnda kirjeldatud rolli metaandmetes pole
+    """
+    spec = table_spec(table)
+    variables = meta.get("variables", [])
+    resolved = [None] * len(variables)
+
+    for dim in spec.dimensions:
+        match = next((i for i, v in enumerate(variables) if resolved[i] is None and dim.matches(v)), None)
+        if match is None and dim.time:
+            match = next((i for i, v in enumerate(variables) if resolved[i] is None and v.get("time")), None)
+        if match is None:
+            raise ValueError(f"{table}: dimensiooni '{dim.role}' ei leitud metaandmetest")
+        resolved[match] = dim
+
+    return [
+        (dim or Dimension(v["code"].casefold(), v["code"].casefold()), v["code"])
+        for dim, v in zip(resolved, variables)
+    ]
+
+
+def table_columns(table, meta):
+    """Tulemuse veerunimed metaandmete järjekorras (ilma väärtuste veeruta)."""
+    return [dim.column for dim, _ in resolve_dimensions(table, meta)]
+
+
+def _as_list(values):
+    if values is None or (isinstance(values, (list, tuple)) and not values):
+        return None
+    if isinstance(values, (str, int)):
+        return [str(values)]
+    return [str(v) for v in values]
+
+
+def build_query(table, meta, filters):
+    """
+    :param filters: {roll: väärtus või väärtuste list}; puuduv/None roll = kõik väärtused
+    :return: (API päring, veerufiltrid peegli ja vahemälu võtme jaoks)
+
+    Filtrita roll küsitakse selgelt kõigi väärtustega ("all"), mitte ei jäeta päringust välja:
+    elimineeritav muutuja (metaandmetes "elimination": true) kaoks muidu vastusest ja dekoodrid,
+    mis seovad veerud metaandmete järjekorra järgi, nihutaksid veerge.
+    """
+    dims = resolve_dimensions(table, meta)
+    unknown = set(filters) - {dim.role for dim, _ in dims}
+    if unknown:
+        raise ValueError(f"{table}: tundmatud rollid {sorted(unknown)}")
+
+    query, column_filters = [], {}
+    for dim, code in dims:
+        values = _as_list(filters.get(dim.role))
+        if values:
+            query.append({"code": code, "selection": {"filter": "item", "values": values}})
+        else:
+            query.append({"code": code, "selection": {"filter": "all", "values": ["*"]}})
+        column_filters[dim.column] = values
+    return query, column_filters
+
+
+def decode_response(table, data, fmt, meta):
+    """Dekodeerib API vastuse (json või json-stat2) tabeli veergudega DataFrame'iks."""
+    columns = table_columns(table, meta)
+    if fmt == "json-stat2":
+        return decode_jsonstat2(data, columns)
+    return decode_rows(data, columns)
+
+
+def add_labels(df, table, meta, label_meta=None):
+    """
+    Tagastab koopia nimetuste veergudega (Dimension.label) `label_meta` keeles. Rollid seotakse
+    andmete metaandmetega (`meta`); teise keele metaandmetes on muutujad samas järjekorras.
+    Sisendit ei muudeta, sest see võib olla jagatud vahemälu kirje.
+    """
+    variables = (label_meta or meta)["variables"]
+    labels = {}
+    for i, (dim, _) in enumerate(resolve_dimensions(table, meta)):
+        if dim.label:
+            mapping = dict(zip(variables[i]["values"], variables[i]["valueTexts"]))
+            labels[dim.label] = df[dim.column].map(mapping)
+    return df.assign(**labels) if labels else df
+
+
+def _role_options(table, meta, label_meta):
+    variables = label_meta["variables"]
+    return {
+        dim.role: [{"label": lbl, "value": val} for val, lbl in zip(variables[i]["values"], variables[i]["valueTexts"])]
+        for i, (dim, _) in enumerate(resolve_dimensions(table, meta))
+    }
+
+
+def role_options(table, lang="et"):
+    """Valikud rollide kaupa `lang` keeles: {roll: [{"label", "value"}, ...]} (nt dropdown'ide jaoks)."""
+    return _role_options(table, get_table_meta(table, DATA_LANG), get_table_meta(table, lang))
+
+
+async def role_options_async(table, lang="et"):
+    """Asünkroonne role_options."""
+    return _role_options(table, await get_table_meta_async(table, DATA_LANG), await get_table_meta_async(table, lang))
+
+
+def fetch_table(table, filters=None, lang="et", fmt=None) -> pd.DataFrame:
+    """
+    Tabeli andmed rollide kaupa antud filtritega.
+
+    Numbrid on keelest sõltumatud ja tuuakse/vahemälustatakse ühe korra (utils.cube, DATA_LANG),
+    nimetused lisatakse `lang` metaandmetest. Tulemuses on dimensioonid järjestatud kategooriliste
+    koodiveergudena ja "väärtus" float'ina.
+    """
+    filters = filters or {}
+    df = get_cube(
+        table,
+        lambda meta: build_query(table, meta, filters),
+        lambda data, fmt, meta: decode_response(table, data, fmt, meta),
+        fmt,
+    )
+    return add_labels(df, table, get_table_meta(table, DATA_LANG), get_table_meta(table, lang))
+
+
+async def fetch_table_async(table, filters=None, lang="et", fmt=None) -> pd.DataFrame:
+    """Asünkroonne fetch_table (vt utils.async_client.gather_sync)."""
+    filters = filters or {}
+    df = await get_cube_async(
+        table,
+        lambda meta: build_query(table, meta, filters),
+        lambda data, fmt, meta: decode_response(table, data, fmt, meta),
+        fmt,
+    )
+    return add_labels(df, table, await get_table_meta_async(table, DATA_LANG), await get_table_meta_async(table, lang))
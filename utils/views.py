@@ -0,0 +1,29 @@
+import os
+
+from utils.cache import TTLCache
+
+
+# Materialiseeritud vaated: andmetest tuletatud tabelid (pivot, sortimine, sildid), mis arvutatakse
+# üks kord andmete versiooni ja keele kohta ning mida renderdused ainult loevad
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE", "32"))
+view_cache = TTLCache(maxsize=VIEW_CACHE_SIZE)
+
+
+def data_version(df):
+    """
+    Andmekuubi versioon (utils.cube märgib selle DataFrame.attrs-i): tabeli versioon ja toomise aeg,
+    nii et ka versioonita tabeli uus laadimine annab uue võtme. None, kui märge puudub.
+    """
+    version = (df.attrs.get("table_version"), df.attrs.get("fetched_at"))
+    return None if version == (None, None) else version
+
+
+def materialized(name, df, lang, build):
+    """
+    Tagastab vaate `name` andmete `df` versiooni ja keele `lang` kohta; puudumisel arvutab `build()`.
+    Märketa andmete puhul arvutatakse vaade iga kord (vältimaks aegunud tulemust).
+    """
+    version = data_version(df)
+    if version is None:
+        return build()
+    return view_cache.get_or_set((name, lang, version), build)
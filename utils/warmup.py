@@ -0,0 +1,76 @@
+"""
+Vahemälude soojendamine käivitamisel: metaandmed, vaikimisi andmekogumid ja lehtede algsed joonised.
+
+gunicorn.conf.py kutsub warmup() välja enne workerite fork'i (preload_app) ilma lõimedeta
+(utils.workers.inline), nii et iga worker alustab soojade vahemäludega ja käivitab oma taustalõimed
+ise. /ready vastab 200 alles pärast seda.
+"""
+import logging
+import os
+import threading
+import time
+
+from utils.cube import DATA_LANG
+from utils.helpers import get_table_meta
+
+
+_log = logging.getLogger(__name__)
+
+WARMUP_LANGS = [lang for lang in os.getenv("STAT_WARMUP_LANGS", "et,en").split(",") if lang]
+WARMUP_TABLES = ["PA103", "PA117"]
+
+_ready = threading.Event()
+_status = {"started": None, "finished": None, "duration_s": None, "errors": []}
+
+
+def _steps(langs):
+    from layouts.economy.salary import cached_comparison_figure, cached_salary_figure
+    from layouts.economy.salary_short import cached_salary_short_figure, width_buckets
+
+    # Numbrid tuuakse DATA_LANG metaandmete järgi, nimetused iga keele omadest
+    for table in WARMUP_TABLES:
+        for lang in dict.fromkeys([DATA_LANG, *langs]):
+            yield f"meta {table} {lang}", lambda t=table, l=lang: get_table_meta(t, l)
+    for lang in langs:
+        yield f"salary {lang}", lambda l=lang: cached_salary_figure(lang=l)
+        yield f"comparison {lang}", lambda l=lang: cached_comparison_figure(l)
+        # Callback annab laiuseks window.innerWidth, seega soojendatakse kõik laiuse ämbrid
+        # (tulpade režiimis ei sõltu joonis laiusest ja kõik kutsed tabavad sama kirjet)
+        for width in width_buckets():
+            yield f"salary_short {lang} {width}", lambda l=lang, w=width: cached_salary_short_figure(l, width=w)
+
+
+def warmup(langs=None):
+    """
+    Täidab vahemälud ja märgib rakenduse valmis olevaks. Ebaõnnestunud samm logitakse ja jäetakse
+    vahele (andmed tuuakse siis esimese kasutaja päringuga), et API katkestus ei takistaks käivitust.
+    """
+    if _ready.is_set():
+        return status()
+    started = time.monotonic()
+    _status["started"] = time.time()
+    for name, step in _steps(langs or WARMUP_LANGS):
+        try:
+            step()
+        except Exception as e:
+            _log.warning("Warmup step %s failed: %s", name, e)
+            _status["errors"].append({"step": name, "error": repr(e)})
+    _status["finished"] = time.time()
+    _status["duration_s"] = round(time.monotonic() - started, 2)
+    _ready.set()
+    return status()
+
+
+def warmup_in_background(langs=None):
+    """Arendusserveri jaoks: soojendus eraldi lõimes, /ready muutub valmis pärast lõppu."""
+    thread = threading.Thread(target=warmup, args=(langs,), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def status():
+    return {"ready": is_ready(), **_status}
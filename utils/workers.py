@@ -0,0 +1,71 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# Paralleelsete API päringute arv ühe lehe laadimisel (piiratud, et mitte üle koormata stat.ee-d)
+FETCH_WORKERS = int(os.getenv("STAT_FETCH_WORKERS", "4"))
+
+# Suure päringu osade (utils.fetch_data.plan_chunks) paralleelsus. Eraldi kogum, sest osad
+# käivitatakse ka fetch_pool'i tööde seest ja ühise kogumi korral võiks see ummikusse jääda.
+CHUNK_WORKERS = int(os.getenv("STAT_CHUNK_WORKERS", "4"))
+
+_pools = {}
+_lock = threading.Lock()
+_inline_pid = None
+
+
+class _InlineExecutor:
+    """Täidab tööd kohe kutsuja lõimes; sama liides nagu ThreadPoolExecutor.submit'il."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+@contextmanager
+def inline():
+    """
+    Ploki sees täidetakse kogumite tööd kutsuja lõimes ja taustalõimi ei käivitata (vt threads_allowed).
+    Kasutatakse gunicorn'i masteris enne fork'i: lõime hoitud lukk jääks lapsprotsessis igaveseks kinni.
+    """
+    global _inline_pid
+    _inline_pid = os.getpid()
+    try:
+        yield
+    finally:
+        _inline_pid = None
+
+
+def threads_allowed():
+    return _inline_pid != os.getpid()
+
+
+def _pool(name, workers):
+    if not threads_allowed():
+        return _InlineExecutor()
+    # Luuakse laisalt ja pärast fork'i uuesti, sest lõimed ei ela fork'i üle
+    pid = os.getpid()
+    entry = _pools.get(name)
+    if entry is None or entry[1] != pid:
+        with _lock:
+            entry = _pools.get(name)
+            if entry is None or entry[1] != pid:
+                entry = (ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stat-{name}"), pid)
+                _pools[name] = entry
+    return entry[0]
+
+
+def fetch_pool() -> ThreadPoolExecutor:
+    """Protsessi ühine piiratud lõimekogum andmepäringute jaoks."""
+    return _pool("fetch", FETCH_WORKERS)
+
+
+def chunk_pool() -> ThreadPoolExecutor:
+    """Protsessi ühine piiratud lõimekogum ühe suure päringu osade jaoks."""
+    return _pool("chunk", CHUNK_WORKERS)